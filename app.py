@@ -15,13 +15,14 @@ logging.getLogger('tornado.access').setLevel(logging.ERROR)
 
 # 导入核心模块
 # 导入核心模块
+from core.config import MODELS_DIR
 from database.connection import init_database
 from core.worker import start_worker
 # OLD: from ui.sidebar import render_sidebar
 from ui.settings_modal import render_settings_dialog
 from ui.pages.media_library import render_media_library_page
 from ui.pages.task_queue import render_task_queue_page
-from ui.styles import HERO_CSS
+from ui.styles import HERO_CSS, LOGO_DATA_URI
 
 
 # ============================================================================
@@ -43,15 +44,11 @@ def main():
     col_h1, col_h2, col_h3, col_h4, col_settings = st.columns([2.2, 1.3, 3, 0.8, 0.8])
     
     with col_h1:
-        # 使用 base64 编码图片并用 flexbox 实现垂直居中
-        import base64
-        with open("assets/logo.png", "rb") as f:
-            logo_base64 = base64.b64encode(f.read()).decode()
-        
+        # 使用 base64 编码图片（导入时编码一次）并用 flexbox 实现垂直居中
         st.markdown(
             f"""
             <div style='display: flex; align-items: center; gap: 16px;'>
-                <img src='data:image/png;base64,{logo_base64}' style='height: 48px; width: 48px; object-fit: contain;' />
+                <img src='{LOGO_DATA_URI}' style='height: 48px; width: 48px; object-fit: contain;' />
                 <h1 style='margin: 0; font-size: 32px; font-weight: 700; line-height: 48px;'>NAS 字幕管家</h1>
             </div>
             """,
@@ -90,12 +87,12 @@ def main():
 
 if __name__ == "__main__":
     # 创建必要的目录
-    os.makedirs("./data/models", exist_ok=True)
+    os.makedirs(MODELS_DIR, exist_ok=True)
     
     # 初始化数据库
     init_database()
     
-    # 启动后台工作器（仅启动一次）
+    # 启动后台工作器（start_worker 自带进程级防重入，此处仅避免每次重跑都调用）
     if 'worker_started' not in st.session_state:
         print("[Main] Starting worker thread...")
         start_worker()
@@ -6,9 +6,11 @@
 """
 
 import json
-import copy  # ✅ 新增：用于深拷贝配置字典
+import os
+import time
+from types import MappingProxyType
 from typing import Dict, Optional
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 
 from core.models import (
     ContentType,
@@ -20,6 +22,14 @@ from core.models import (
 )
 
 
+# ============================================================================
+# 路径配置
+# ============================================================================
+
+# Whisper 模型缓存目录（容器内通过 NAS_MODELS_DIR 指向挂载卷，重建容器后无需重新下载）
+MODELS_DIR = os.environ.get("NAS_MODELS_DIR", "./data/models")
+
+
 # ============================================================================
 # VAD 参数预设
 # ============================================================================
@@ -85,7 +95,8 @@ CONTENT_TYPE_DESCRIPTIONS = {
 # LLM 提供商配置
 # ============================================================================
 
-LLM_PROVIDERS = {
+# 只读映射：模块仅导入一次，所有会话共享同一份实例
+LLM_PROVIDERS = MappingProxyType({
     "Ollama (本地模型)": {
         "base_url": "http://ollama:11434/v1",
         "model": "qwen2.5:7b",
@@ -126,7 +137,13 @@ LLM_PROVIDERS = {
         "model": "",
         "help": "手动填写"
     }
-}
+})
+
+# 各提供商的默认配置（未保存过该提供商的配置时共享此实例；ProviderConfig 不可变）
+DEFAULT_PROVIDER_CONFIGS = MappingProxyType({
+    name: ProviderConfig(base_url=info['base_url'], model_name=info['model'])
+    for name, info in LLM_PROVIDERS.items()
+})
 
 
 # ============================================================================
@@ -160,15 +177,13 @@ class AppConfig:
         return VAD_PRESETS.get(self.content_type, VAD_PRESETS[ContentType.MOVIE])
     
     def get_current_provider_config(self) -> ProviderConfig:
-        """获取当前提供商的配置"""
-        if self.current_provider not in self.provider_configs:
-            default = LLM_PROVIDERS.get(self.current_provider, {})
-            return ProviderConfig(
-                api_key='',
-                base_url=default.get('base_url', ''),
-                model_name=default.get('model', '')
-            )
-        return self.provider_configs[self.current_provider]
+        """获取当前提供商的配置（未配置时返回共享的默认配置）"""
+        config = self.provider_configs.get(self.current_provider)
+        if config is None:
+            config = DEFAULT_PROVIDER_CONFIGS.get(self.current_provider)
+            if config is None:
+                config = ProviderConfig()
+        return config
     
     def update_provider_config(
         self, 
@@ -198,6 +213,19 @@ class AppConfig:
             }
         }
     
+    def fingerprint(self) -> tuple:
+        """配置指纹（嵌套的值元组，比较时无需构建字典）"""
+        return (
+            self.whisper.fingerprint(),
+            self.translation.fingerprint(),
+            self.export.fingerprint(),
+            self.content_type.value if isinstance(self.content_type, ContentType) else self.content_type,
+            self.current_provider,
+            tuple(sorted(
+                (k, v.fingerprint()) for k, v in self.provider_configs.items()
+            ))
+        )
+    
     @classmethod
     def from_dict(cls, data: Dict) -> 'AppConfig':
         """从字典创建配置对象"""
@@ -241,6 +269,10 @@ class AppConfig:
 # 配置持久化（与数据库交互）
 # ============================================================================
 
+# 配置版本号所在的 key（每次保存时更新，用于判断缓存的配置是否过期）
+CONFIG_VERSION_KEY = '__version__'
+
+
 class ConfigManager:
     """配置管理器（负责配置的加载和保存）"""
     
@@ -252,47 +284,67 @@ class ConfigManager:
             db_connection: 数据库连接工厂函数
         """
         self.get_db = db_connection
-        self._last_saved_config_dict = {}  # ✅ 新增：缓存上一次保存或加载的配置
+        self._last_saved_fingerprint: Optional[tuple] = None  # 上一次保存或加载的配置指纹
+        self._cached_config: Optional[AppConfig] = None
+        self._cached_version: Optional[str] = None
+    
+    def load_cached(self) -> AppConfig:
+        """
+        加载配置（版本号未变化时直接返回上次加载的配置）
+        
+        只查询一行版本号，适合后台循环中频繁调用；返回的配置对象会被复用，调用方不应修改
+        """
+        conn = self.get_db()
+        row = conn.execute(
+            "SELECT value FROM config WHERE key=?", (CONFIG_VERSION_KEY,)
+        ).fetchone()
+        version = row[0] if row else None
+        
+        if self._cached_config is not None and version == self._cached_version:
+            return self._cached_config
+        
+        return self.load()
     
     def load(self) -> AppConfig:
         """从数据库加载配置"""
         conn = self.get_db()
-        try:
-            cursor = conn.execute("SELECT key, value FROM config")
-            config_dict = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            if not config_dict:
-                # ✅ 修改：初始化默认配置时也记录缓存
-                default_config = AppConfig()
-                self._last_saved_config_dict = default_config.to_dict()
-                return default_config
-            
-            # 构建嵌套配置字典
-            data = {
-                'whisper': {
-                    'model_size': config_dict.get('whisper_model', 'base'),
-                    'compute_type': config_dict.get('compute_type', 'int8'),
-                    'device': config_dict.get('device', 'cpu'),
-                    'source_language': config_dict.get('source_language', 'auto')
-                },
-                'translation': {
-                    'enabled': config_dict.get('enable_translation', 'false') == 'true',
-                    'target_language': config_dict.get('target_language', 'zh'),
-                    'max_lines_per_batch': int(config_dict.get('max_lines_per_batch', 500))
-                },
-                'export': json.loads(config_dict.get('export_formats', '{"formats": ["srt"]}')),
-                'content_type': config_dict.get('content_type', 'movie'),
-                'current_provider': config_dict.get('current_provider', 'Ollama (本地模型)'),
-                'provider_configs': json.loads(config_dict.get('provider_configs', '{}'))
-            }
-            
-            # ✅ 修改：加载完成后更新缓存
-            loaded_config = AppConfig.from_dict(data)
-            self._last_saved_config_dict = loaded_config.to_dict()
-            return loaded_config
-            
-        finally:
-            conn.close()
+        cursor = conn.execute("SELECT key, value FROM config")
+        config_dict = {row[0]: row[1] for row in cursor}
+        
+        if not config_dict:
+            # ✅ 修改：初始化默认配置时也记录缓存
+            default_config = AppConfig()
+            self._last_saved_fingerprint = default_config.fingerprint()
+            self._cached_config = default_config
+            self._cached_version = None
+            return default_config
+        
+        # 构建嵌套配置字典
+        data = {
+            'whisper': {
+                'model_size': config_dict.get('whisper_model', 'base'),
+                'compute_type': config_dict.get('compute_type', 'int8'),
+                'device': config_dict.get('device', 'cpu'),
+                'source_language': config_dict.get('source_language', 'auto'),
+                'batch_size': int(config_dict.get('whisper_batch_size', 0))
+            },
+            'translation': {
+                'enabled': config_dict.get('enable_translation', 'false') == 'true',
+                'target_language': config_dict.get('target_language', 'zh'),
+                'max_lines_per_batch': int(config_dict.get('max_lines_per_batch', 500))
+            },
+            'export': json.loads(config_dict.get('export_formats', '{"formats": ["srt"]}')),
+            'content_type': config_dict.get('content_type', 'movie'),
+            'current_provider': config_dict.get('current_provider', 'Ollama (本地模型)'),
+            'provider_configs': json.loads(config_dict.get('provider_configs', '{}'))
+        }
+        
+        # ✅ 修改：加载完成后更新缓存
+        loaded_config = AppConfig.from_dict(data)
+        self._last_saved_fingerprint = loaded_config.fingerprint()
+        self._cached_config = loaded_config
+        self._cached_version = config_dict.get(CONFIG_VERSION_KEY)
+        return loaded_config
     
     def save(self, config: AppConfig) -> bool:
         """
@@ -301,10 +353,10 @@ class ConfigManager:
         Returns:
             bool: True 表示实际执行了保存，False 表示未变更无需保存
         """
-        # ✅ 新增：获取新配置的字典形式并比对
-        new_config_dict = config.to_dict()
+        # 比对配置指纹（元组比较，不构建字典）
+        new_fingerprint = config.fingerprint()
         
-        if new_config_dict == self._last_saved_config_dict:
+        if new_fingerprint == self._last_saved_fingerprint:
             # 如果配置内容完全一致，跳过数据库操作
             return False
 
@@ -316,6 +368,7 @@ class ConfigManager:
                 'compute_type': config.whisper.compute_type,
                 'device': config.whisper.device,
                 'source_language': config.whisper.source_language,
+                'whisper_batch_size': str(config.whisper.batch_size),
                 'enable_translation': 'true' if config.translation.enabled else 'false',
                 'target_language': config.translation.target_language,
                 'max_lines_per_batch': str(config.translation.max_lines_per_batch),
@@ -325,27 +378,25 @@ class ConfigManager:
                 'provider_configs': json.dumps(
                     {k: v.to_dict() for k, v in config.provider_configs.items()},
                     ensure_ascii=False
-                )
+                ),
+                CONFIG_VERSION_KEY: str(time.time_ns())
             }
             
-            for key, value in flat_config.items():
-                conn.execute(
-                    "INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)",
-                    (key, str(value))
-                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)",
+                [(key, str(value)) for key, value in flat_config.items()]
+            )
             
             conn.commit()
             
             # ✅ 新增：保存成功后更新缓存
-            self._last_saved_config_dict = copy.deepcopy(new_config_dict)
+            self._last_saved_fingerprint = new_fingerprint
             return True
             
         except Exception as e:
             print(f"Failed to save config: {e}")
             conn.rollback()
             raise
-        finally:
-            conn.close()
 
 
 # ============================================================================
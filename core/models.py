@@ -6,9 +6,12 @@
 """
 
 from enum import Enum
+from types import MappingProxyType
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 
+from utils import json_utils
+
 
 # ============================================================================
 # 枚举类型
@@ -37,7 +40,7 @@ class ContentType(Enum):
 # 字幕相关模型
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class SubtitleInfo:
     """字幕文件信息"""
     path: str
@@ -60,7 +63,7 @@ class SubtitleInfo:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class SubtitleEntry:
     """通用字幕条目"""
     index: str
@@ -104,9 +107,9 @@ class VADParameters:
         }
 
 
-@dataclass
+@dataclass(frozen=True)
 class ProviderConfig:
-    """LLM 提供商配置"""
+    """LLM 提供商配置（不可变，默认配置实例可安全共享）"""
     api_key: str = ''
     base_url: str = ''
     model_name: str = ''
@@ -118,6 +121,10 @@ class ProviderConfig:
             'model_name': self.model_name
         }
     
+    def fingerprint(self) -> tuple:
+        """配置指纹（字段值组成的元组，用于快速判断配置是否变化）"""
+        return (self.api_key, self.base_url, self.model_name)
+    
     @classmethod
     def from_dict(cls, data: Dict) -> 'ProviderConfig':
         return cls(
@@ -134,14 +141,26 @@ class WhisperConfig:
     compute_type: str = 'int8'
     device: str = 'cpu'
     source_language: str = 'auto'
+    batch_size: int = 0  # 批量推理大小（0=自动，1=关闭批处理）
     
     def to_dict(self) -> Dict:
         return {
             'model_size': self.model_size,
             'compute_type': self.compute_type,
             'device': self.device,
-            'source_language': self.source_language
+            'source_language': self.source_language,
+            'batch_size': self.batch_size
         }
+    
+    def fingerprint(self) -> tuple:
+        """配置指纹（字段值组成的元组，用于快速判断配置是否变化）"""
+        return (
+            self.model_size,
+            self.compute_type,
+            self.device,
+            self.source_language,
+            self.batch_size
+        )
 
 
 @dataclass
@@ -161,6 +180,16 @@ class TranslationConfig:
             'max_retries': self.max_retries,
             'timeout': self.timeout
         }
+    
+    def fingerprint(self) -> tuple:
+        """配置指纹（字段值组成的元组，用于快速判断配置是否变化）"""
+        return (
+            self.enabled,
+            self.target_language,
+            self.max_lines_per_batch,
+            self.max_retries,
+            self.timeout
+        )
 
 
 @dataclass
@@ -171,6 +200,10 @@ class ExportConfig:
     def to_dict(self) -> Dict:
         return {'formats': self.formats}
     
+    def fingerprint(self) -> tuple:
+        """配置指纹（字段值组成的元组，用于快速判断配置是否变化）"""
+        return (tuple(self.formats),)
+    
     @classmethod
     def from_dict(cls, data: Dict) -> 'ExportConfig':
         return cls(formats=data.get('formats', ['srt']))
@@ -180,7 +213,7 @@ class ExportConfig:
 # 任务模型
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """任务实体"""
     id: int
@@ -223,7 +256,7 @@ class Task:
 # 媒体文件模型
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class MediaFile:
     """媒体文件实体"""
     id: int
@@ -246,7 +279,7 @@ class MediaFile:
             'file_name': self.file_name,
             'file_size': self.file_size,
             'subtitles': [s.to_dict() for s in self.subtitles],
-            'has_subtitle': self.has_subtitle,
+            'has_subtitle': bool(self.subtitles),
             'has_translated': self.has_translated,
             'updated_at': self.updated_at
         }
@@ -255,8 +288,7 @@ class MediaFile:
     def from_dict(cls, data: Dict) -> 'MediaFile':
         subtitles_data = data.get('subtitles', [])
         if isinstance(subtitles_data, str):
-            import json
-            subtitles_data = json.loads(subtitles_data)
+            subtitles_data = json_utils.loads(subtitles_data)
         
         subtitles = [SubtitleInfo.from_dict(s) for s in subtitles_data]
         
@@ -275,26 +307,31 @@ class MediaFile:
 # 常量定义
 # ============================================================================
 
-# 支持的视频格式
-SUPPORTED_VIDEO_EXTENSIONS = {
-    '.mp4', '.mkv', '.mov', '.avi', 
-    '.flv', '.wmv', '.m4v', '.webm', '.ts'
-}
+# 支持的视频格式（小写、不含点号，与 name.rpartition('.')[2] 直接比较）
+SUPPORTED_VIDEO_EXTENSIONS = frozenset({
+    'mp4', 'mkv', 'mov', 'avi',
+    'flv', 'wmv', 'm4v', 'webm', 'ts'
+})
 
 # 支持的字幕格式
-SUPPORTED_SUBTITLE_FORMATS = {
+SUPPORTED_SUBTITLE_FORMATS = frozenset({
     'srt', 'vtt', 'ass', 'ssa', 'sub'
-}
+})
 
-# 语言代码映射
-ISO_LANG_MAP = {
+# 语言代码映射（只读，进程内共享）
+ISO_LANG_MAP = MappingProxyType({
     'auto': '自动检测',
     'zh': '中文', 'en': '英语', 'ja': '日语', 'ko': '韩语',
     'fr': '法语', 'de': '德语', 'ru': '俄语', 'es': '西班牙语',
     'chs': '简中', 'cht': '繁中', 'eng': '英语', 
     'jpn': '日语', 'kor': '韩语',
     'unknown': '未知'
-}
+})
+
+# 中文名称 -> 语言代码的反向索引（同名时保留先出现的两字母代码，如 英语 -> en）
+LANG_NAME_TO_CODE = MappingProxyType({
+    name: code for code, name in reversed(ISO_LANG_MAP.items())
+})
 
 # 目标语言选项
 TARGET_LANG_OPTIONS = ['zh', 'en', 'ja', 'ko']
\ No newline at end of file
@@ -8,15 +8,34 @@
 import os
 import time
 import threading
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
 from core.models import TaskStatus
 from core.config import AppConfig, ConfigManager
 from database.connection import wait_for_database, get_db_connection
-from database.task_dao import TaskDAO
+from database.task_dao import TaskDAO, TASK_EVENT
 from services.media_scanner import rescan_video_subtitles
-from services.whisper_service import WhisperService
+
+
+# 无任务时的最长等待时间（秒）：新任务通过 TASK_EVENT 立即唤醒，
+# 超时兜底用于发现绕过 TaskDAO 直接写入数据库的任务
+IDLE_WAIT_SECONDS = 60
+
+# 循环出错后的重试等待（秒）：连续出错时翻倍，直到上限；成功一轮后复位
+ERROR_BACKOFF_INITIAL = 10
+ERROR_BACKOFF_MAX = 60
+
+
+def _extract_progress(task_id: int, current: int, total: int, message: str):
+    """字幕提取进度回调（用 partial 绑定任务 ID；高频进度合并写入）"""
+    TaskDAO.post_progress(task_id, current, message)
+
+
+def _translate_progress(task_id: int, current: int, total: int, message: str):
+    """翻译进度回调（翻译阶段映射到总进度 50%~95%）"""
+    TaskDAO.post_progress(task_id, 50 + int((current / total) * 45), message)
 
 
 class TaskWorker:
@@ -26,6 +45,11 @@ class TaskWorker:
         """初始化任务处理器"""
         self.running = False
         self.config_manager = ConfigManager(get_db_connection)
+        
+        # Whisper 服务跨任务复用，Whisper/VAD 配置变化时才重建
+        # （任务在单个处理线程中顺序执行，无需加锁）
+        self._whisper = None
+        self._whisper_key: Optional[tuple] = None
     
     def start(self):
         """启动处理器（在独立线程中运行）"""
@@ -48,13 +72,19 @@ class TaskWorker:
         """停止处理器"""
         print("[TaskWorker] Stopping...")
         self.running = False
+        TASK_EVENT.set()
     
     def _worker_loop(self):
         """工作循环（持续处理任务）"""
+        error_backoff = ERROR_BACKOFF_INITIAL
+        
         while self.running:
             try:
-                # 加载最新配置
-                config = self.config_manager.load()
+                # 加载最新配置（未保存过新配置时复用缓存）
+                config = self.config_manager.load_cached()
+                
+                # 先清除通知再查询，查询之后加入的任务会重新置位，不会漏掉
+                TASK_EVENT.clear()
                 
                 # 获取待处理任务
                 task = TaskDAO.get_pending_task()
@@ -63,12 +93,15 @@ class TaskWorker:
                     print(f"[TaskWorker] Processing task {task.id}: {task.file_path}")
                     self._process_task(task.id, task.file_path, config)
                 else:
-                    # 无任务时休眠
-                    time.sleep(5)
+                    # 无任务时等待新任务通知
+                    TASK_EVENT.wait(timeout=IDLE_WAIT_SECONDS)
+                
+                error_backoff = ERROR_BACKOFF_INITIAL
             
             except Exception as e:
-                print(f"[TaskWorker] Error in worker loop: {e}")
-                time.sleep(10)
+                print(f"[TaskWorker] Error in worker loop: {e}, retrying in {error_backoff}s")
+                time.sleep(error_backoff)
+                error_backoff = min(error_backoff * 2, ERROR_BACKOFF_MAX)
     
     def _process_task(self, task_id: int, file_path: str, config: AppConfig):
         """
@@ -80,6 +113,18 @@ class TaskWorker:
             config: 应用配置
         """
         try:
+            # 检查文件是否存在（先检查，文件丢失时只需写一次失败状态；
+            # stat 结果留给最后的媒体库更新，避免重复检查）
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                TaskDAO.update_task(
+                    task_id,
+                    status=TaskStatus.FAILED,
+                    log="文件丢失"
+                )
+                return
+            
             # 更新任务状态
             TaskDAO.update_task(
                 task_id,
@@ -88,24 +133,16 @@ class TaskWorker:
                 log="任务启动"
             )
             
-            # 检查文件是否存在
-            if not os.path.exists(file_path):
-                TaskDAO.update_task(
-                    task_id,
-                    status=TaskStatus.FAILED,
-                    log="文件丢失"
-                )
-                return
+            # 字幕路径只计算一次，各步骤共用
+            srt_path = Path(file_path).with_suffix('.srt')
             
             # 步骤 1: Whisper 提取字幕
-            srt_path = self._extract_subtitle(task_id, file_path, config)
-            
-            if not srt_path:
+            if not self._extract_subtitle(task_id, file_path, srt_path, config):
                 return  # 提取失败
             
             # 步骤 2: 翻译字幕（如果启用）
             if config.translation.enabled:
-                self._translate_subtitle(task_id, srt_path, config)
+                self._translate_subtitle(task_id, str(srt_path), config)
             else:
                 TaskDAO.update_task(
                     task_id,
@@ -115,10 +152,10 @@ class TaskWorker:
                 )
             
             # 步骤 3: 导出其他格式（如果配置）
-            self._export_formats(task_id, file_path, config)
+            self._export_formats(task_id, srt_path, config)
             
             # 步骤 4: 更新媒体库
-            rescan_video_subtitles(file_path)
+            rescan_video_subtitles(file_path, file_stat)
             
             print(f"[TaskWorker] Task {task_id} completed")
         
@@ -134,22 +171,30 @@ class TaskWorker:
         self,
         task_id: int,
         file_path: str,
+        srt_path: Path,
         config: AppConfig
     ) -> Optional[str]:
         """
         提取字幕（步骤 1）
         
+        Args:
+            task_id: 任务 ID
+            file_path: 视频文件路径
+            srt_path: 输出 SRT 路径
+            config: 应用配置
+        
         Returns:
             SRT 文件路径，失败则返回 None
         """
-        srt_path = Path(file_path).with_suffix('.srt')
-        
         # 如果字幕已存在，跳过
         if srt_path.exists():
             TaskDAO.update_task(task_id, progress=50, log="基础字幕已存在")
             return str(srt_path)
         
         try:
+            # 延迟导入：faster_whisper / ctranslate2 体积较大，只在首次提取字幕时加载
+            from services.whisper_service import WhisperService
+            
             # 加载 Whisper 服务
             TaskDAO.update_task(
                 task_id,
@@ -158,17 +203,17 @@ class TaskWorker:
             )
             
             vad_params = config.get_vad_parameters()
-            whisper = WhisperService(config.whisper, vad_params)
-            
-            # 定义进度回调
-            def progress_callback(current, total, message):
-                TaskDAO.update_task(task_id, progress=current, log=message)
+            key = (config.whisper.fingerprint(), tuple(vad_params.to_dict().values()))
+            if key != self._whisper_key:
+                self._whisper = WhisperService(config.whisper, vad_params)
+                self._whisper_key = key
+            whisper = self._whisper
             
             # 提取字幕
             whisper.extract_subtitle(
                 file_path,
                 str(srt_path),
-                progress_callback
+                partial(_extract_progress, task_id)
             )
             
             return str(srt_path)
@@ -215,16 +260,11 @@ class TaskWorker:
                 max_lines_per_batch=config.translation.max_lines_per_batch
             )
             
-            # 定义进度回调
-            def progress_callback(current, total, message):
-                progress = 50 + int((current / total) * 45)
-                TaskDAO.update_task(task_id, progress=progress, log=message)
-            
             # 执行翻译
             success, msg = translate_srt_file(
                 srt_path,
                 trans_config,
-                progress_callback=progress_callback
+                progress_callback=partial(_translate_progress, task_id)
             )
             
             if success:
@@ -260,7 +300,7 @@ class TaskWorker:
     def _export_formats(
         self,
         task_id: int,
-        file_path: str,
+        srt_path: Path,
         config: AppConfig
     ):
         """
@@ -268,43 +308,39 @@ class TaskWorker:
         
         Args:
             task_id: 任务 ID
-            file_path: 文件路径
+            srt_path: SRT 文件路径
             config: 应用配置
         """
+        formats = [fmt for fmt in config.export.formats if fmt != 'srt']  # SRT 已生成
+        if not formats:
+            return
+        
         try:
-            from subtitle_converter import SubtitleConverter
-            
-            srt_path = Path(file_path).with_suffix('.srt')
-            exported_formats = []
-            
-            for fmt in config.export.formats:
-                if fmt == 'srt':
-                    continue  # SRT 已生成
-                
+            from services.subtitle_converter import SubtitleConverter
+        except ImportError:
+            return  # 转换器模块未安装
+        
+        # 每个字幕文件只解析一次，再逐个格式写出
+        exported_formats = []
+        try:
+            exported = SubtitleConverter.convert_to_formats(str(srt_path), formats)
+            exported_formats = [fmt.upper() for fmt in formats if fmt in exported]
+        except Exception as e:
+            print(f"[TaskWorker] Failed to export {srt_path}: {e}")
+        
+        # 如果有翻译版本，也转换
+        if config.translation.enabled:
+            trans_srt = srt_path.with_name(
+                f"{srt_path.stem}.{config.translation.target_language}.srt"
+            )
+            if trans_srt.exists():
                 try:
-                    # 转换原始字幕
-                    SubtitleConverter.convert_file(str(srt_path), fmt)
-                    exported_formats.append(fmt.upper())
-                    
-                    # 如果有翻译版本，也转换
-                    if config.translation.enabled:
-                        trans_srt = Path(file_path).parent / \
-                                   f"{Path(file_path).stem}.{config.translation.target_language}.srt"
-                        if trans_srt.exists():
-                            SubtitleConverter.convert_file(str(trans_srt), fmt)
-                
+                    SubtitleConverter.convert_to_formats(str(trans_srt), formats)
                 except Exception as e:
-                    print(f"[TaskWorker] Failed to export {fmt}: {e}")
-            
-            if exported_formats:
-                current_log = TaskDAO.get_task_by_id(task_id).log
-                TaskDAO.update_task(
-                    task_id,
-                    log=f"{current_log}（已导出: {', '.join(exported_formats)}）"
-                )
+                    print(f"[TaskWorker] Failed to export {trans_srt}: {e}")
         
-        except ImportError:
-            pass  # 转换器模块未安装
+        if exported_formats:
+            TaskDAO.append_log(task_id, f"（已导出: {', '.join(exported_formats)}）")
 
 
 # ============================================================================
@@ -313,15 +349,20 @@ class TaskWorker:
 
 _worker_instance: Optional[TaskWorker] = None
 
+# 进程级启动锁：多个会话同时进入时只会启动一个处理循环
+# （session_state 仅按会话隔离，无法防止重复启动）
+_worker_lock = threading.Lock()
+
 
 def start_worker():
-    """启动全局工作器"""
+    """启动全局工作器（进程内只会启动一次）"""
     global _worker_instance
     
-    if _worker_instance is None:
-        _worker_instance = TaskWorker()
-    
-    _worker_instance.start()
+    with _worker_lock:
+        if _worker_instance is None:
+            _worker_instance = TaskWorker()
+        
+        _worker_instance.start()
 
 
 def stop_worker():
@@ -5,7 +5,11 @@
 提供统一的数据库访问接口
 """
 
+import atexit
 import sqlite3
+import threading
+import time
+import weakref
 from pathlib import Path
 from typing import Optional
 
@@ -13,15 +17,88 @@ from typing import Optional
 # 数据库路径
 DB_PATH = "./data/subtitle_manager.db"
 
+# 每个连接缓存的预编译语句数（DAO 中的 SQL 均为固定文本，默认 128 之外留足余量）
+CACHED_STATEMENTS = 256
+
+# 连接级 PRAGMA（WAL 允许读写并发，NORMAL 同步在 WAL 下只在检查点时 fsync；
+# 页缓存 64MB，写锁冲突时最多等待 5 秒）
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def _configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """
+    为新建连接设置 PRAGMA
+    
+    Args:
+        conn: 数据库连接
+    
+    Returns:
+        sqlite3.Connection: 配置后的连接
+    """
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class _Connection(sqlite3.Connection):
+    """可被弱引用的连接类型（内置 Connection 不支持 weakref）"""
+    pass
+
+
+# 线程本地连接缓存：每个线程首次访问时建立连接，之后复用
+_local = threading.local()
+
+# 所有已建立的连接（弱引用，线程退出后自动移除），用于进程退出时统一关闭
+_open_connections = weakref.WeakSet()
+
 
 def get_db_connection() -> sqlite3.Connection:
     """
-    获取数据库连接
+    获取当前线程的数据库连接（首次调用时建立并缓存）
+    
+    调用方不要关闭返回的连接；写操作仍需自行 commit/rollback。
     
     Returns:
         sqlite3.Connection: 数据库连接对象
     """
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(
+            DB_PATH,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+            factory=_Connection
+        )
+        _configure_connection(conn)
+        _local.conn = conn
+        _open_connections.add(conn)
+    return conn
+
+
+def close_db_connection():
+    """关闭当前线程缓存的数据库连接"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        _local.conn = None
+        _open_connections.discard(conn)
+        conn.close()
+
+
+@atexit.register
+def _close_all_connections():
+    """进程退出时关闭所有仍存活的连接"""
+    for conn in list(_open_connections):
+        try:
+            conn.close()
+        except Exception:
+            pass
 
 
 def init_database():
@@ -41,11 +118,29 @@ def init_database():
                 file_name TEXT NOT NULL,
                 file_size INTEGER,
                 subtitles_json TEXT DEFAULT '[]',
+                has_subtitle INTEGER DEFAULT 0,
                 has_translated INTEGER DEFAULT 0,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
         
+        # 迁移：旧库补充 has_subtitle 列，并按已有字幕数据回填
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(media_files)")}
+        if 'has_subtitle' not in columns:
+            cursor.execute(
+                "ALTER TABLE media_files ADD COLUMN has_subtitle INTEGER DEFAULT 0"
+            )
+            cursor.execute(
+                "UPDATE media_files SET has_subtitle = "
+                "(subtitles_json IS NOT NULL AND subtitles_json NOT IN ('', '[]'))"
+            )
+        
+        # 媒体库筛选索引：WHERE has_subtitle=? ORDER BY file_name 直接按索引顺序读取，无需排序
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_media_has_subtitle_name "
+            "ON media_files(has_subtitle, file_name)"
+        )
+        
         # 创建任务表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS tasks (
@@ -59,6 +154,12 @@ def init_database():
             )
         """)
         
+        # 任务状态索引：(status, id) 同时服务按状态过滤和按 id 取最早的待处理任务，
+        # 按状态计数/删除也可使用其前缀，无需再单独建 status 索引
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_status_id ON tasks(status, id)"
+        )
+        
         # 创建配置表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS config (
@@ -74,22 +175,22 @@ def init_database():
         print(f"[Database] Initialization failed: {e}")
         conn.rollback()
         raise
-    finally:
-        conn.close()
 
 
 def check_database_health() -> bool:
     """
     检查数据库健康状态
     
+    读取 schema_version 只访问数据库头，不触及业务表；
+    版本号为 0 表示表结构尚未初始化
+    
     Returns:
         bool: 数据库是否可用
     """
     try:
         conn = get_db_connection()
-        conn.execute("SELECT 1 FROM config LIMIT 1")
-        conn.close()
-        return True
+        schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        return schema_version > 0
     except Exception as e:
         print(f"[Database] Health check failed: {e}")
         return False
@@ -106,8 +207,6 @@ def wait_for_database(max_retries: int = 30, retry_interval: float = 1.0) -> boo
     Returns:
         bool: 数据库是否就绪
     """
-    import time
-    
     for i in range(max_retries):
         if check_database_health():
             if i > 0:
@@ -144,7 +243,6 @@ class DatabaseConnection:
                 self.conn.commit()
             else:
                 self.conn.rollback()
-            self.conn.close()
         return False  # 不抑制异常
 
 
@@ -164,11 +262,8 @@ def execute_query(query: str, params: tuple = ()) -> list:
         list: 查询结果
     """
     conn = get_db_connection()
-    try:
-        cursor = conn.execute(query, params)
-        return cursor.fetchall()
-    finally:
-        conn.close()
+    cursor = conn.execute(query, params)
+    return cursor.fetchall()
 
 
 def execute_update(query: str, params: tuple = ()) -> int:
@@ -190,13 +285,11 @@ def execute_update(query: str, params: tuple = ()) -> int:
     except Exception as e:
         conn.rollback()
         raise e
-    finally:
-        conn.close()
 
 
 def execute_many(query: str, params_list: list) -> int:
     """
-    批量执行语句
+    批量执行语句（单个事务，整批只提交一次）
     
     Args:
         query: SQL 语句
@@ -206,12 +299,6 @@ def execute_many(query: str, params_list: list) -> int:
         int: 受影响的总行数
     """
     conn = get_db_connection()
-    try:
+    with conn:
         cursor = conn.executemany(query, params_list)
-        conn.commit()
-        return cursor.rowcount
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
\ No newline at end of file
+    return cursor.rowcount
\ No newline at end of file
@@ -5,11 +5,11 @@
 负责媒体文件相关的数据库操作
 """
 
-import json
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from database.connection import get_db_connection, execute_many
 from core.models import MediaFile, SubtitleInfo
+from utils import json_utils
 
 
 class MediaDAO:
@@ -23,40 +23,14 @@ class MediaDAO:
         Returns:
             媒体文件列表
         """
-        conn = get_db_connection()
-        try:
-            cursor = conn.execute(
-                "SELECT id, file_path, file_name, file_size, subtitles_json, "
-                "has_translated, updated_at FROM media_files ORDER BY file_name"
-            )
-            
-            media_files = []
-            for row in cursor.fetchall():
-                try:
-                    media = MediaFile(
-                        id=row[0],
-                        file_path=row[1],
-                        file_name=row[2],
-                        file_size=row[3],
-                        subtitles=MediaDAO._parse_subtitles(row[4]),
-                        has_translated=bool(row[5]),
-                        updated_at=row[6]
-                    )
-                    media_files.append(media)
-                except Exception as e:
-                    print(f"[MediaDAO] Failed to parse media file {row[0]}: {e}")
-                    continue
-            
-            return media_files
-        finally:
-            conn.close()
+        return list(MediaDAO.iter_media_files())
     
     @staticmethod
     def get_media_files_filtered(
         has_subtitle: Optional[bool] = None
     ) -> List[MediaFile]:
         """
-        获取筛选后的媒体文件
+        获取筛选后的媒体文件（筛选在 SQL 中完成，只解析命中行的字幕 JSON）
         
         Args:
             has_subtitle: 是否有字幕（None=全部, True=有字幕, False=无字幕）
@@ -64,12 +38,54 @@ class MediaDAO:
         Returns:
             媒体文件列表
         """
-        all_files = MediaDAO.get_all_media_files()
+        return list(MediaDAO.iter_media_files(has_subtitle))
+    
+    @staticmethod
+    def iter_media_files(
+        has_subtitle: Optional[bool] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Iterator[MediaFile]:
+        """
+        按文件名顺序逐个产出媒体文件（边读取边解析，调用方可边遍历边过滤）
         
+        Args:
+            has_subtitle: 是否有字幕（None=全部, True=有字幕, False=无字幕）
+            limit: 最多返回条数（None=不限）
+            offset: 跳过的条数（分页用）
+        
+        Yields:
+            媒体文件
+        """
         if has_subtitle is None:
-            return all_files
+            where, params = "", ()
+        else:
+            where, params = "WHERE has_subtitle=? ", (int(has_subtitle),)
         
-        return [f for f in all_files if f.has_subtitle == has_subtitle]
+        conn = get_db_connection()
+        cursor = conn.execute(
+            "SELECT id, file_path, file_name, file_size, subtitles_json, "
+            f"has_translated, updated_at FROM media_files {where}"
+            "ORDER BY file_name LIMIT ? OFFSET ?",
+            params + (-1 if limit is None else limit, offset)
+        )
+        
+        for row in cursor:
+            try:
+                media = MediaFile(
+                    id=row[0],
+                    file_path=row[1],
+                    file_name=row[2],
+                    file_size=row[3],
+                    subtitles=MediaDAO._parse_subtitles(row[4]),
+                    has_translated=bool(row[5]),
+                    updated_at=row[6]
+                )
+            except Exception as e:
+                print(f"[MediaDAO] Failed to parse media file {row[0]}: {e}")
+                continue
+            
+            yield media
     
     @staticmethod
     def get_media_by_path(file_path: str) -> Optional[MediaFile]:
@@ -83,27 +99,24 @@ class MediaDAO:
             媒体文件对象，如果不存在则返回 None
         """
         conn = get_db_connection()
-        try:
-            result = conn.execute(
-                "SELECT id, file_path, file_name, file_size, subtitles_json, "
-                "has_translated, updated_at FROM media_files WHERE file_path=?",
-                (file_path,)
-            ).fetchone()
-            
-            if not result:
-                return None
-            
-            return MediaFile(
-                id=result[0],
-                file_path=result[1],
-                file_name=result[2],
-                file_size=result[3],
-                subtitles=MediaDAO._parse_subtitles(result[4]),
-                has_translated=bool(result[5]),
-                updated_at=result[6]
-            )
-        finally:
-            conn.close()
+        result = conn.execute(
+            "SELECT id, file_path, file_name, file_size, subtitles_json, "
+            "has_translated, updated_at FROM media_files WHERE file_path=?",
+            (file_path,)
+        ).fetchone()
+        
+        if not result:
+            return None
+        
+        return MediaFile(
+            id=result[0],
+            file_path=result[1],
+            file_name=result[2],
+            file_size=result[3],
+            subtitles=MediaDAO._parse_subtitles(result[4]),
+            has_translated=bool(result[5]),
+            updated_at=result[6]
+        )
     
     @staticmethod
     def add_or_update_media_file(
@@ -125,23 +138,22 @@ class MediaDAO:
         """
         conn = get_db_connection()
         try:
-            subtitles_json = json.dumps(
-                [s.to_dict() for s in subtitles],
-                ensure_ascii=False
-            )
+            subtitles_json = json_utils.dumps([s.to_dict() for s in subtitles])
             
             conn.execute(
                 "INSERT OR REPLACE INTO media_files "
-                "(file_path, file_name, file_size, subtitles_json, has_translated, updated_at) "
-                "VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
-                (file_path, file_name, file_size, subtitles_json, int(has_translated))
+                "(file_path, file_name, file_size, subtitles_json, has_subtitle, "
+                "has_translated, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                (
+                    file_path, file_name, file_size, subtitles_json,
+                    int(bool(subtitles)), int(has_translated)
+                )
             )
             conn.commit()
         except Exception as e:
             print(f"[MediaDAO] Failed to add/update media file: {e}")
             conn.rollback()
-        finally:
-            conn.close()
     
     @staticmethod
     def batch_add_or_update_media_files(media_files: List[tuple]):
@@ -149,13 +161,15 @@ class MediaDAO:
         批量添加或更新媒体文件
         
         Args:
-            media_files: 元组列表 [(file_path, file_name, file_size, subtitles_json, has_translated), ...]
+            media_files: 元组列表 [(file_path, file_name, file_size, subtitles_json,
+                                  has_subtitle, has_translated), ...]
         """
         try:
             execute_many(
                 "INSERT OR REPLACE INTO media_files "
-                "(file_path, file_name, file_size, subtitles_json, has_translated, updated_at) "
-                "VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                "(file_path, file_name, file_size, subtitles_json, has_subtitle, "
+                "has_translated, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
                 media_files
             )
         except Exception as e:
@@ -178,22 +192,17 @@ class MediaDAO:
         """
         conn = get_db_connection()
         try:
-            subtitles_json = json.dumps(
-                [s.to_dict() for s in subtitles],
-                ensure_ascii=False
-            )
+            subtitles_json = json_utils.dumps([s.to_dict() for s in subtitles])
             
             conn.execute(
-                "UPDATE media_files SET subtitles_json=?, has_translated=?, "
+                "UPDATE media_files SET subtitles_json=?, has_subtitle=?, has_translated=?, "
                 "updated_at=CURRENT_TIMESTAMP WHERE file_path=?",
-                (subtitles_json, int(has_translated), file_path)
+                (subtitles_json, int(bool(subtitles)), int(has_translated), file_path)
             )
             conn.commit()
         except Exception as e:
             print(f"[MediaDAO] Failed to update media subtitles: {e}")
             conn.rollback()
-        finally:
-            conn.close()
     
     @staticmethod
     def delete_media_file(file_path: str):
@@ -210,8 +219,21 @@ class MediaDAO:
         except Exception as e:
             print(f"[MediaDAO] Failed to delete media file: {e}")
             conn.rollback()
-        finally:
-            conn.close()
+    
+    @staticmethod
+    def get_scan_index() -> Dict[str, Tuple[int, int]]:
+        """
+        获取增量扫描索引
+        
+        Returns:
+            {file_path: (file_size, updated_at 的 Unix 时间戳)}
+        """
+        conn = get_db_connection()
+        cursor = conn.execute(
+            "SELECT file_path, file_size, "
+            "CAST(strftime('%s', updated_at) AS INTEGER) FROM media_files"
+        )
+        return {row[0]: (row[1], row[2] or 0) for row in cursor}
     
     @staticmethod
     def get_media_count() -> int:
@@ -222,11 +244,8 @@ class MediaDAO:
             文件数量
         """
         conn = get_db_connection()
-        try:
-            result = conn.execute("SELECT COUNT(*) FROM media_files").fetchone()
-            return result[0] if result else 0
-        finally:
-            conn.close()
+        result = conn.execute("SELECT COUNT(*) FROM media_files").fetchone()
+        return result[0] if result else 0
     
     @staticmethod
     def _parse_subtitles(subtitles_json: str) -> List[SubtitleInfo]:
@@ -239,8 +258,12 @@ class MediaDAO:
         Returns:
             字幕信息列表
         """
+        # 无字幕的文件（常见情况）无需解析
+        if not subtitles_json or subtitles_json == '[]':
+            return []
+        
         try:
-            data = json.loads(subtitles_json)
+            data = json_utils.loads(subtitles_json)
             return [SubtitleInfo.from_dict(s) for s in data]
         except Exception as e:
             print(f"[MediaDAO] Failed to parse subtitles JSON: {e}")
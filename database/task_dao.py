@@ -6,12 +6,47 @@
 """
 
 import sqlite3
-from typing import List, Optional, Tuple
+import threading
+import time
+from itertools import product
+from typing import Dict, List, Optional, Tuple
 
 from database.connection import get_db_connection
 from core.models import Task, TaskStatus
 
 
+# update_task 的 SQL，按 (status, progress, log) 是否提供预先生成 7 种组合；
+# SQL 文本固定不变，可直接命中 sqlite3 的语句缓存
+_UPDATE_TASK_COLUMNS = ('status', 'progress', 'log')
+_UPDATE_TASK_SQL = {
+    mask: "UPDATE tasks SET "
+          + "".join(f"{col}=?," for col, on in zip(_UPDATE_TASK_COLUMNS, mask) if on)
+          + "updated_at=CURRENT_TIMESTAMP WHERE id=?"
+    for mask in product((False, True), repeat=3)
+    if any(mask)
+}
+
+# 新任务通知：有任务进入 pending 状态时置位，后台工作器据此立即唤醒
+TASK_EVENT = threading.Event()
+
+# 进度写入合并：进度回调只记录每个任务的最新进度，由后台线程每隔
+# PROGRESS_FLUSH_INTERVAL 秒批量写库一次；状态变更仍通过 update_task 立即提交
+PROGRESS_FLUSH_INTERVAL = 0.25
+_pending_progress: Dict[int, Tuple[int, str]] = {}
+_progress_lock = threading.Lock()
+_progress_posted = threading.Event()
+_progress_flusher: Optional[threading.Thread] = None
+
+
+def _progress_flush_loop():
+    """进度写入线程：有新进度时等待一个合并周期后统一写库"""
+    while True:
+        _progress_posted.wait()
+        time.sleep(PROGRESS_FLUSH_INTERVAL)
+        _progress_posted.clear()
+        TaskDAO.flush_progress()
+
+
 class TaskDAO:
     """任务数据访问对象"""
     
@@ -33,14 +68,50 @@ class TaskDAO:
                 (file_path,)
             )
             conn.commit()
+            TASK_EVENT.set()
             return True, "任务已添加"
         except sqlite3.IntegrityError:
+            conn.rollback()
             return False, "任务已存在"
         except Exception as e:
             print(f"[TaskDAO] Failed to add task: {e}")
+            conn.rollback()
             return False, f"添加失败: {str(e)}"
-        finally:
-            conn.close()
+    
+    @staticmethod
+    def add_tasks(file_paths: List[str]) -> Tuple[int, List[str]]:
+        """
+        批量添加任务（单个事务，只提交一次）
+        
+        Args:
+            file_paths: 文件路径列表
+        
+        Returns:
+            (新增任务数, 已存在的文件路径列表)
+        """
+        conn = get_db_connection()
+        added = 0
+        existing = []
+        try:
+            for file_path in file_paths:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO tasks (file_path, status, log) "
+                    "VALUES (?, 'pending', '准备中')",
+                    (file_path,)
+                )
+                if cursor.rowcount:
+                    added += 1
+                else:
+                    existing.append(file_path)
+            conn.commit()
+        except Exception as e:
+            print(f"[TaskDAO] Failed to add tasks: {e}")
+            conn.rollback()
+            raise
+        
+        if added:
+            TASK_EVENT.set()
+        return added, existing
     
     @staticmethod
     def get_all_tasks() -> List[Task]:
@@ -51,62 +122,56 @@ class TaskDAO:
             任务列表
         """
         conn = get_db_connection()
-        try:
-            cursor = conn.execute(
-                "SELECT id, file_path, status, progress, log, created_at, updated_at "
-                "FROM tasks ORDER BY id DESC"
-            )
-            
-            tasks = []
-            for row in cursor.fetchall():
-                try:
-                    task = Task(
-                        id=row[0],
-                        file_path=row[1],
-                        status=TaskStatus(row[2]),
-                        progress=row[3],
-                        log=row[4],
-                        created_at=row[5],
-                        updated_at=row[6]
-                    )
-                    tasks.append(task)
-                except Exception as e:
-                    print(f"[TaskDAO] Failed to parse task {row[0]}: {e}")
-                    continue
-            
-            return tasks
-        finally:
-            conn.close()
+        cursor = conn.execute(
+            "SELECT id, file_path, status, progress, log, created_at, updated_at "
+            "FROM tasks ORDER BY id DESC"
+        )
+        
+        tasks = []
+        for row in cursor:
+            try:
+                task = Task(
+                    id=row[0],
+                    file_path=row[1],
+                    status=TaskStatus(row[2]),
+                    progress=row[3],
+                    log=row[4],
+                    created_at=row[5],
+                    updated_at=row[6]
+                )
+                tasks.append(task)
+            except Exception as e:
+                print(f"[TaskDAO] Failed to parse task {row[0]}: {e}")
+                continue
+        
+        return tasks
     
     @staticmethod
     def get_pending_task() -> Optional[Task]:
         """
-        获取第一个待处理任务
+        获取第一个待处理任务（按添加顺序）
         
         Returns:
             任务对象，如果没有则返回 None
         """
         conn = get_db_connection()
-        try:
-            result = conn.execute(
-                "SELECT id, file_path, status, progress, log, created_at, updated_at "
-                "FROM tasks WHERE status='pending' LIMIT 1"
-            ).fetchone()
-            
-            if not result:
-                return None
-            
-            return Task(
-                id=result[0],
-                file_path=result[1],
-                status=TaskStatus(result[2]),
-                progress=result[3],
-                log=result[4],
-                created_at=result[5],
-                updated_at=result[6]
-            )
-        finally:
-            conn.close()
+        result = conn.execute(
+            "SELECT id, file_path, status, progress, log, created_at, updated_at "
+            "FROM tasks WHERE status='pending' ORDER BY id LIMIT 1"
+        ).fetchone()
+        
+        if not result:
+            return None
+        
+        return Task(
+            id=result[0],
+            file_path=result[1],
+            status=TaskStatus(result[2]),
+            progress=result[3],
+            log=result[4],
+            created_at=result[5],
+            updated_at=result[6]
+        )
     
     @staticmethod
     def get_task_by_id(task_id: int) -> Optional[Task]:
@@ -120,27 +185,24 @@ class TaskDAO:
             任务对象，如果不存在则返回 None
         """
         conn = get_db_connection()
-        try:
-            result = conn.execute(
-                "SELECT id, file_path, status, progress, log, created_at, updated_at "
-                "FROM tasks WHERE id=?",
-                (task_id,)
-            ).fetchone()
-            
-            if not result:
-                return None
-            
-            return Task(
-                id=result[0],
-                file_path=result[1],
-                status=TaskStatus(result[2]),
-                progress=result[3],
-                log=result[4],
-                created_at=result[5],
-                updated_at=result[6]
-            )
-        finally:
-            conn.close()
+        result = conn.execute(
+            "SELECT id, file_path, status, progress, log, created_at, updated_at "
+            "FROM tasks WHERE id=?",
+            (task_id,)
+        ).fetchone()
+        
+        if not result:
+            return None
+        
+        return Task(
+            id=result[0],
+            file_path=result[1],
+            status=TaskStatus(result[2]),
+            progress=result[3],
+            log=result[4],
+            created_at=result[5],
+            updated_at=result[6]
+        )
     
     @staticmethod
     def update_task(
@@ -158,38 +220,109 @@ class TaskDAO:
             progress: 进度（可选）
             log: 日志（可选）
         """
+        key = (status is not None, progress is not None, log is not None)
+        if not any(key):
+            return
+        
+        params = []
+        if status is not None:
+            params.append(status.value if isinstance(status, TaskStatus) else status)
+        if progress is not None:
+            params.append(progress)
+        if log is not None:
+            params.append(log)
+        params.append(task_id)
+        
+        # 丢弃尚未写入的合并进度：本次更新更新，持锁可保证进度写入线程不会在之后覆盖
+        with _progress_lock:
+            _pending_progress.pop(task_id, None)
+        
         conn = get_db_connection()
         try:
-            updates = []
-            params = []
-            
-            if status is not None:
-                updates.append("status=?")
-                params.append(status.value if isinstance(status, TaskStatus) else status)
-            
-            if progress is not None:
-                updates.append("progress=?")
-                params.append(progress)
-            
-            if log is not None:
-                updates.append("log=?")
-                params.append(log)
-            
-            if not updates:
-                return
-            
-            updates.append("updated_at=CURRENT_TIMESTAMP")
-            params.append(task_id)
-            
-            query = f"UPDATE tasks SET {','.join(updates)} WHERE id=?"
-            conn.execute(query, params)
+            conn.execute(_UPDATE_TASK_SQL[key], params)
             conn.commit()
             
         except Exception as e:
             print(f"[TaskDAO] Failed to update task {task_id}: {e}")
             conn.rollback()
-        finally:
-            conn.close()
+    
+    @staticmethod
+    def append_log(task_id: int, text: str):
+        """
+        在任务日志末尾追加内容（单条 SQL 完成拼接，无需先读出旧日志）
+        
+        Args:
+            task_id: 任务 ID
+            text: 追加的文本
+        """
+        # 与 update_task 相同：丢弃尚未写入的合并进度，避免之后覆盖本次追加
+        with _progress_lock:
+            _pending_progress.pop(task_id, None)
+        
+        conn = get_db_connection()
+        try:
+            conn.execute(
+                "UPDATE tasks SET log = log || ?, updated_at=CURRENT_TIMESTAMP "
+                "WHERE id=?",
+                (text, task_id)
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"[TaskDAO] Failed to append log for task {task_id}: {e}")
+            conn.rollback()
+    
+    @staticmethod
+    def post_progress(task_id: int, progress: int, log: str):
+        """
+        提交任务进度（只保留最新值，由后台线程合并写库）
+        
+        适合高频的进度回调；终态（完成/失败）请使用 update_task 立即写入
+        
+        Args:
+            task_id: 任务 ID
+            progress: 进度
+            log: 日志
+        """
+        global _progress_flusher
+        
+        with _progress_lock:
+            _pending_progress[task_id] = (progress, log)
+            
+            if _progress_flusher is None:
+                _progress_flusher = threading.Thread(
+                    target=_progress_flush_loop,
+                    name="ProgressFlusher",
+                    daemon=True
+                )
+                _progress_flusher.start()
+        
+        _progress_posted.set()
+    
+    @staticmethod
+    def flush_progress():
+        """把合并中的进度写入数据库（单个事务）"""
+        with _progress_lock:
+            if not _pending_progress:
+                return
+            
+            rows = [
+                (progress, log, task_id)
+                for task_id, (progress, log) in _pending_progress.items()
+            ]
+            _pending_progress.clear()
+            
+            # 写库期间持锁，保证 update_task 的后续写入一定晚于这里
+            conn = get_db_connection()
+            try:
+                conn.executemany(
+                    "UPDATE tasks SET progress=?, log=?, updated_at=CURRENT_TIMESTAMP "
+                    "WHERE id=?",
+                    rows
+                )
+                conn.commit()
+            except Exception as e:
+                print(f"[TaskDAO] Failed to flush task progress: {e}")
+                conn.rollback()
     
     @staticmethod
     def delete_task(task_id: int):
@@ -206,8 +339,6 @@ class TaskDAO:
         except Exception as e:
             print(f"[TaskDAO] Failed to delete task {task_id}: {e}")
             conn.rollback()
-        finally:
-            conn.close()
     
     @staticmethod
     def clear_completed_tasks():
@@ -221,8 +352,6 @@ class TaskDAO:
         except Exception as e:
             print(f"[TaskDAO] Failed to clear completed tasks: {e}")
             conn.rollback()
-        finally:
-            conn.close()
     
     @staticmethod
     def reset_task(task_id: int):
@@ -240,11 +369,10 @@ class TaskDAO:
                 (task_id,)
             )
             conn.commit()
+            TASK_EVENT.set()
         except Exception as e:
             print(f"[TaskDAO] Failed to reset task {task_id}: {e}")
             conn.rollback()
-        finally:
-            conn.close()
     
     @staticmethod
     def get_task_count_by_status(status: TaskStatus) -> int:
@@ -258,14 +386,25 @@ class TaskDAO:
             任务数量
         """
         conn = get_db_connection()
-        try:
-            result = conn.execute(
-                "SELECT COUNT(*) FROM tasks WHERE status=?",
-                (status.value,)
-            ).fetchone()
-            return result[0] if result else 0
-        finally:
-            conn.close()
+        result = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE status=?",
+            (status.value,)
+        ).fetchone()
+        return result[0] if result else 0
+    
+    @staticmethod
+    def has_active_task() -> bool:
+        """
+        检查是否有等待中或处理中的任务（用于决定任务页是否需要定时刷新）
+        
+        Returns:
+            bool: 是否有未结束的任务
+        """
+        conn = get_db_connection()
+        result = conn.execute(
+            "SELECT 1 FROM tasks WHERE status IN ('pending', 'processing') LIMIT 1"
+        ).fetchone()
+        return result is not None
     
     @staticmethod
     def has_processing_task() -> bool:
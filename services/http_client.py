@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 客户端
+提供进程级共享的 httpx 连接池，LLM 翻译与 Ollama 接口复用同一组 keep-alive 连接
+"""
+
+import threading
+from typing import Optional
+
+import httpx
+
+
+# 连接池参数（keep-alive 连接数需覆盖分批翻译的最大并发数）
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY = 120.0
+
+# 默认超时（秒），单次请求可通过 timeout= 覆盖
+DEFAULT_TIMEOUT = 60.0
+
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    获取共享的 HTTP 客户端（首次调用时创建）
+
+    Returns:
+        httpx.Client: 线程安全的共享客户端
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    timeout=DEFAULT_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY
+                    )
+                )
+    return _client
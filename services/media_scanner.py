@@ -6,17 +6,118 @@
 """
 
 import os
+import queue
+import threading
+from bisect import bisect_left
+from collections import deque
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 
 from core.models import SubtitleInfo, SUPPORTED_VIDEO_EXTENSIONS
 from database.media_dao import MediaDAO
+from utils import json_utils
 from utils.lang_detection import detect_language_combined
 
 
 # 默认媒体根目录
 MEDIA_ROOT = "/media"
 
+# 扫描流水线参数：字幕检测线程数、队列容量（背压）、每批写库条数
+SCAN_WORKERS = min(8, os.cpu_count() or 1)
+SCAN_QUEUE_SIZE = 256
+SCAN_BATCH_SIZE = 500
+
+# 同目录 SRT 索引：按小写文件名排序的 ((小写文件名, 文件名, 路径), ...)，
+# 以视频名为前缀的字幕在其中连续排列，可二分定位
+SrtIndex = Tuple[Tuple[str, str, str], ...]
+
+
+def walk_media_files(
+    root: str
+) -> Iterator[Tuple[str, str, os.stat_result, SrtIndex]]:
+    """
+    递归遍历目录，逐个产出支持的视频文件及其同目录的 SRT 文件
+    
+    基于 os.scandir：文件类型来自目录项缓存，不为每个条目构造 Path；
+    同目录的 SRT 列表在同一次目录读取中收集，字幕检测无需再次读取目录。
+    与 os.walk 一致，不进入符号链接目录，无权限的目录直接跳过
+    
+    Args:
+        root: 起始目录
+    
+    Yields:
+        (文件路径, 文件名, 文件 stat 结果, 同目录 SRT 索引)
+    """
+    stack = [root]
+    
+    while stack:
+        current_dir = stack.pop()
+        videos = []
+        srt_files = []
+        
+        try:
+            with os.scandir(current_dir) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    
+                    _, dot, ext = entry.name.rpartition('.')
+                    if not dot:
+                        continue
+                    ext = ext.lower()
+                    
+                    try:
+                        if ext == 'srt':
+                            if entry.is_file():
+                                srt_files.append((entry.name, entry.path))
+                        elif ext in SUPPORTED_VIDEO_EXTENSIONS and entry.is_file():
+                            videos.append(entry)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"[MediaScanner] Cannot read directory {current_dir}: {e}")
+            continue
+        
+        srt_files = _index_srt(srt_files)
+        for entry in videos:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            yield entry.path, entry.name, st, srt_files
+
+
+def _index_srt(srt_files: List[Tuple[str, str]]) -> SrtIndex:
+    """
+    为同目录的 SRT 文件建立前缀索引
+    
+    Args:
+        srt_files: [(文件名, 文件路径), ...]
+    
+    Returns:
+        按小写文件名排序的 ((小写文件名, 文件名, 文件路径), ...)
+    """
+    return tuple(sorted((name.lower(), name, path) for name, path in srt_files))
+
+
+def _list_srt(parent_dir: str) -> SrtIndex:
+    """
+    列出目录下的 SRT 文件（单个视频重新扫描时使用）
+    
+    Args:
+        parent_dir: 目录路径
+    
+    Returns:
+        同目录 SRT 索引
+    """
+    with os.scandir(parent_dir) as it:
+        return _index_srt([
+            (entry.name, entry.path)
+            for entry in it
+            if entry.name.lower().endswith('.srt') and entry.is_file()
+        ])
+
 
 class MediaScanner:
     """媒体扫描器"""
@@ -47,24 +148,27 @@ class MediaScanner:
         
         try:
             # 使用广度优先搜索，避免递归过深
-            to_scan = [(self.media_root, 0)]  # (路径, 深度)
+            to_scan = deque([(str(self.media_root), '', 0)])  # (路径, 相对路径, 深度)
             
             while to_scan:
-                current_dir, depth = to_scan.pop(0)
+                current_dir, current_rel, depth = to_scan.popleft()
                 
                 if depth >= max_depth:
                     continue
                 
                 try:
-                    for item in current_dir.iterdir():
-                        if item.is_dir() and not item.name.startswith('.'):
-                            # 计算相对路径
-                            rel_path = str(item.relative_to(self.media_root))
+                    with os.scandir(current_dir) as it:
+                        for entry in it:
+                            if entry.name.startswith('.') or not entry.is_dir():
+                                continue
+                            
+                            # 相对路径由上一层拼接而来
+                            rel_path = f"{current_rel}/{entry.name}" if current_rel else entry.name
                             subdirs.append(rel_path)
                             
                             # 继续扫描下一层
                             if depth + 1 < max_depth:
-                                to_scan.append((item, depth + 1))
+                                to_scan.append((entry.path, rel_path, depth + 1))
                 except PermissionError:
                     continue
         
@@ -103,103 +207,224 @@ class MediaScanner:
         debug_logs = []
         batch_data = []
         
+        # 增量扫描：大小未变且视频与所在目录都在上次入库后未修改的文件直接跳过
+        scan_index = MediaDAO.get_scan_index()
+        walk_stats = {'skipped': 0}
+        
         if debug:
             debug_logs.append(f"📂 扫描目录: {scan_path}")
         
-        try:
-            # 遍历目录
-            for root, dirs, files in os.walk(scan_path):
-                for file in files:
-                    file_path = Path(root) / file
-                    
-                    # 检查是否为支持的视频格式
-                    if file_path.suffix.lower() not in SUPPORTED_VIDEO_EXTENSIONS:
-                        continue
-                    
-                    try:
-                        # 扫描字幕文件
-                        subtitles = self._scan_subtitles_for_video(file_path)
-                        
-                        # 检查是否有翻译
-                        has_translated = self._check_has_translation(subtitles)
-                        
-                        # 准备批量插入数据
-                        import json
-                        subtitles_json = json.dumps(
-                            [s.to_dict() for s in subtitles],
-                            ensure_ascii=False
-                        )
-                        
-                        batch_data.append((
-                            str(file_path),
-                            file,
-                            file_path.stat().st_size,
-                            subtitles_json,
-                            int(has_translated)
-                        ))
-                        
-                        added_count += 1
-                        
-                        if debug:
-                            debug_logs.append(f"✓ 发现: {file}")
-                    
-                    except Exception as e:
-                        if debug:
-                            debug_logs.append(f"✗ 错误 {file}: {e}")
-            
-            # 批量写入数据库
-            if batch_data:
-                MediaDAO.batch_add_or_update_media_files(batch_data)
-                if debug:
-                    debug_logs.append(f"✓ 批量写入 {len(batch_data)} 条记录")
+        # 三段式流水线：遍历线程 -> 字幕检测线程池 -> 当前线程批量写库
+        read_q = queue.Queue(maxsize=SCAN_QUEUE_SIZE)
+        write_q = queue.Queue(maxsize=SCAN_QUEUE_SIZE)
         
-        except Exception as e:
-            print(f"[MediaScanner] Scan failed: {e}")
+        threads = [threading.Thread(
+            target=self._walk_into_queue,
+            args=(str(scan_path), read_q, SCAN_WORKERS, scan_index, walk_stats),
+            daemon=True
+        )]
+        threads.extend(
+            threading.Thread(
+                target=self._scan_worker,
+                args=(read_q, write_q),
+                daemon=True
+            )
+            for _ in range(SCAN_WORKERS)
+        )
+        for t in threads:
+            t.start()
+        
+        write_failed = False
+        finished_workers = 0
+        
+        def flush_batch():
+            nonlocal write_failed
+            if not batch_data:
+                return
+            if not write_failed:
+                try:
+                    MediaDAO.batch_add_or_update_media_files(batch_data)
+                    if debug:
+                        debug_logs.append(f"✓ 批量写入 {len(batch_data)} 条记录")
+                except Exception as e:
+                    # 写库失败后继续排空队列，避免上游线程阻塞
+                    write_failed = True
+                    print(f"[MediaScanner] Scan failed: {e}")
+                    if debug:
+                        debug_logs.append(f"✗ 扫描失败: {e}")
+            batch_data.clear()
+        
+        while finished_workers < SCAN_WORKERS:
+            item = write_q.get()
+            if item is None:
+                finished_workers += 1
+                continue
+            
+            row, log = item
+            if row is not None:
+                batch_data.append(row)
+                added_count += 1
+                if len(batch_data) >= SCAN_BATCH_SIZE:
+                    flush_batch()
+            
             if debug:
-                debug_logs.append(f"✗ 扫描失败: {e}")
+                debug_logs.append(log)
+        
+        flush_batch()
+        
+        for t in threads:
+            t.join()
+        
+        if debug and walk_stats['skipped']:
+            debug_logs.append(f"⏭ 跳过未变化文件 {walk_stats['skipped']} 个")
         
         return added_count, debug_logs
     
-    def _scan_subtitles_for_video(self, video_path: Path) -> List[SubtitleInfo]:
+    @staticmethod
+    def _walk_into_queue(
+        scan_path: str,
+        read_q: queue.Queue,
+        worker_count: int,
+        scan_index: Dict[str, Tuple[int, int]],
+        walk_stats: Dict[str, int]
+    ):
+        """
+        遍历线程：把需要重新扫描的视频文件放入读取队列，结束时为每个工作线程放入一个 None
+        
+        已入库且未变化的文件不入队。新增或删除字幕会修改所在目录的 mtime，
+        因此同时比较视频文件和目录的 mtime
+        
+        Args:
+            scan_path: 扫描路径
+            read_q: 读取队列
+            worker_count: 工作线程数
+            scan_index: {file_path: (file_size, 入库时间戳)}
+            walk_stats: 统计信息，写入跳过数量
+        """
+        dir_mtimes = {}
+        
+        try:
+            for file_path, file, st, srt_files in walk_media_files(scan_path):
+                indexed = scan_index.get(file_path)
+                if indexed is not None and indexed[0] == st.st_size:
+                    parent = os.path.dirname(file_path)
+                    dir_mtime = dir_mtimes.get(parent)
+                    if dir_mtime is None:
+                        dir_mtime = dir_mtimes[parent] = os.stat(parent).st_mtime
+                    if max(st.st_mtime, dir_mtime) < indexed[1]:
+                        walk_stats['skipped'] += 1
+                        continue
+                
+                read_q.put((file_path, file, st.st_size, srt_files))
+        except Exception as e:
+            print(f"[MediaScanner] Walk failed: {e}")
+        finally:
+            for _ in range(worker_count):
+                read_q.put(None)
+    
+    def _scan_worker(self, read_q: queue.Queue, write_q: queue.Queue):
+        """
+        工作线程：检测字幕并生成数据库行，结束时向写入队列放入 None
+        
+        Args:
+            read_q: 读取队列
+            write_q: 写入队列，元素为 (数据库行或 None, 日志)
+        """
+        try:
+            while True:
+                item = read_q.get()
+                if item is None:
+                    break
+                
+                file_path, file, file_size, srt_files = item
+                try:
+                    write_q.put((
+                        self._build_media_row(file_path, file, file_size, srt_files),
+                        f"✓ 发现: {file}"
+                    ))
+                except Exception as e:
+                    write_q.put((None, f"✗ 错误 {file}: {e}"))
+        finally:
+            write_q.put(None)
+    
+    def _build_media_row(
+        self,
+        file_path: str,
+        file: str,
+        file_size: int,
+        srt_files: SrtIndex
+    ) -> tuple:
+        """
+        生成单个视频文件的数据库行
+        
+        Args:
+            file_path: 文件路径
+            file: 文件名
+            file_size: 文件大小
+            srt_files: 同目录 SRT 索引
+        
+        Returns:
+            (file_path, file_name, file_size, subtitles_json, has_subtitle, has_translated)
+        """
+        # 扫描字幕文件
+        subtitles = self._scan_subtitles_for_video(file_path, srt_files)
+        
+        # 检查是否有翻译
+        has_translated = self._check_has_translation(subtitles)
+        
+        # 无字幕（常见情况）直接使用常量，无需序列化
+        subtitles_json = (
+            json_utils.dumps([s.to_dict() for s in subtitles]) if subtitles else '[]'
+        )
+        
+        return (
+            file_path,
+            file,
+            file_size,
+            subtitles_json,
+            int(bool(subtitles)),
+            int(has_translated)
+        )
+    
+    def _scan_subtitles_for_video(
+        self,
+        video_path: str,
+        srt_files: Optional[SrtIndex] = None
+    ) -> List[SubtitleInfo]:
         """
         扫描视频文件对应的字幕
         
         Args:
             video_path: 视频文件路径
+            srt_files: 同目录 SRT 索引（None 时读取目录）
         
         Returns:
             字幕信息列表
         """
         subtitles = []
-        base_name = video_path.stem
-        parent_dir = video_path.parent
+        parent_dir, video_name = os.path.split(video_path)
+        base_name = os.path.splitext(video_name)[0].lower()
         
         try:
-            # 查找同名的 SRT 文件
-            all_files = list(parent_dir.iterdir())
+            # 查找同名的 SRT 文件：在排序索引中二分定位到第一个不小于视频名的条目，
+            # 以视频名为前缀的字幕从这里开始连续排列
+            if srt_files is None:
+                srt_files = _list_srt(parent_dir)
             
-            potential_subs = [
-                p for p in all_files
-                if p.is_file()
-                and p.name.lower().endswith('.srt')
-                and p.name.lower().startswith(base_name.lower())
-            ]
-            
-            for sub_path in potential_subs:
-                sub_name = sub_path.name
+            for i in range(bisect_left(srt_files, (base_name,)), len(srt_files)):
+                lower_name, sub_name, sub_path = srt_files[i]
+                if not lower_name.startswith(base_name):
+                    break
                 
                 # 检测语言
-                lang_code, tag = detect_language_combined(
-                    str(sub_path),
-                    sub_name
-                )
+                lang_code, tag = detect_language_combined(sub_path, sub_name)
                 
-                # 检查是否为默认字幕
-                if sub_path.stem.lower() == base_name.lower():
+                # 检查是否为默认字幕（去掉 .srt 后与视频同名）
+                if lower_name[:-4] == base_name:
                     tag += " (默认)"
                 
                 subtitles.append(SubtitleInfo(
-                    path=str(sub_path),
+                    path=sub_path,
                     lang=lang_code,
                     tag=tag
                 ))
@@ -224,20 +449,23 @@ class MediaScanner:
                 return True
         return False
     
-    def rescan_single_video(self, video_path: str):
+    def rescan_single_video(
+        self,
+        video_path: str,
+        stat: Optional[os.stat_result] = None
+    ):
         """
         重新扫描单个视频文件的字幕
         
         Args:
             video_path: 视频文件路径
+            stat: 调用方已取得的文件 stat（提供时不再重复检查文件是否存在）
         """
-        path = Path(video_path)
-        
-        if not path.exists():
+        if stat is None and not os.path.exists(video_path):
             print(f"[MediaScanner] Video not found: {video_path}")
             return
         
-        subtitles = self._scan_subtitles_for_video(path)
+        subtitles = self._scan_subtitles_for_video(video_path)
         has_translated = self._check_has_translation(subtitles)
         
         MediaDAO.update_media_subtitles(video_path, subtitles, has_translated)
@@ -285,12 +513,16 @@ def discover_media_subdirectories(
     return scanner.discover_subdirectories(max_depth)
 
 
-def rescan_video_subtitles(video_path: str):
+def rescan_video_subtitles(
+    video_path: str,
+    stat: Optional[os.stat_result] = None
+):
     """
     重新扫描视频字幕（快捷函数）
     
     Args:
         video_path: 视频文件路径
+        stat: 调用方已取得的文件 stat（可选）
     """
     scanner = MediaScanner()
-    scanner.rescan_single_video(video_path)
\ No newline at end of file
+    scanner.rescan_single_video(video_path, stat)
\ No newline at end of file
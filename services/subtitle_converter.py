@@ -12,7 +12,20 @@ from dataclasses import dataclass
 from datetime import timedelta
 
 
-@dataclass
+# 预编译正则（解析时每个字幕块都会用到）
+_RE_SRT_TIME = re.compile(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})')
+
+# 完整的 SRT 字幕块：序号行、时间轴行、文本（直到空行或文件结尾）
+_RE_SRT_BLOCK = re.compile(
+    r'^[ \t]*(\d+)[ \t]*\n'
+    r'[ \t]*(\d{2}):(\d{2}):(\d{2}),(\d{3})[\d:,]*[ \t]*-->[ \t]*'
+    r'(\d{2}):(\d{2}):(\d{2}),(\d{3})[^\n]*\n'
+    r'(?!\n)((?:[^\n]|\n(?!\n))*)',
+    re.MULTILINE
+)
+
+
+@dataclass(slots=True)
 class SubtitleEntry:
     """通用字幕条目"""
     index: int
@@ -34,7 +47,7 @@ class SubtitleConverter:
         解析 SRT 时间格式为毫秒
         格式: HH:MM:SS,mmm
         """
-        match = re.match(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})', time_str)
+        match = _RE_SRT_TIME.match(time_str)
         if not match:
             raise ValueError(f"无效的 SRT 时间格式: {time_str}")
         
@@ -88,36 +101,26 @@ class SubtitleConverter:
     
     @staticmethod
     def parse_srt(content: str) -> List[SubtitleEntry]:
-        """解析 SRT 格式"""
+        """
+        解析 SRT 格式
+        
+        单个预编译正则一次扫描整个文件，直接取出序号、时间和文本；
+        缺少文本或时间轴无效的块会被跳过
+        """
         entries = []
-        blocks = content.strip().split('\n\n')
         
-        for block in blocks:
-            lines = block.strip().split('\n')
-            if len(lines) < 3:
+        for m in _RE_SRT_BLOCK.finditer(content):
+            text = m.group(10).strip()
+            if not text:
                 continue
             
-            try:
-                index = int(lines[0].strip())
-                timecode = lines[1].strip()
-                text = '\n'.join(lines[2:]).strip()
-                
-                # 解析时间轴
-                match = re.match(r'([\d:,]+)\s*-->\s*([\d:,]+)', timecode)
-                if not match:
-                    continue
-                
-                start_ms = SubtitleConverter.parse_srt_time(match.group(1))
-                end_ms = SubtitleConverter.parse_srt_time(match.group(2))
-                
-                entries.append(SubtitleEntry(
-                    index=index,
-                    start_ms=start_ms,
-                    end_ms=end_ms,
-                    text=text
-                ))
-            except (ValueError, IndexError):
-                continue
+            h1, m1, s1, ms1, h2, m2, s2, ms2 = map(int, m.group(2, 3, 4, 5, 6, 7, 8, 9))
+            entries.append(SubtitleEntry(
+                index=int(m.group(1)),
+                start_ms=(h1 * 3600 + m1 * 60 + s1) * 1000 + ms1,
+                end_ms=(h2 * 3600 + m2 * 60 + s2) * 1000 + ms2,
+                text=text
+            ))
         
         return entries
     
@@ -276,45 +279,50 @@ Format: Marked, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         return '\n'.join(lines)
     
     @staticmethod
-    def convert_file(input_path: str, 
-                    output_format: str,
-                    output_path: Optional[str] = None) -> str:
+    def read_srt_file(input_path: str) -> List[SubtitleEntry]:
         """
-        转换字幕文件格式
+        读取并解析 SRT 文件（导出多种格式时只需解析一次）
         
         Args:
-            input_path: 输入文件路径（通常是 .srt）
-            output_format: 目标格式 (srt, vtt, ass, ssa, sub)
-            output_path: 输出文件路径（可选，默认自动生成）
+            input_path: SRT 文件路径
         
         Returns:
-            输出文件路径
+            字幕条目列表
         """
-        # 读取输入文件
         with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
         
-        # 解析为通用格式
         entries = SubtitleConverter.parse_srt(content)
         
         if not entries:
             raise ValueError("无法解析字幕文件或文件为空")
         
-        # 转换为目标格式
+        return entries
+    
+    @staticmethod
+    def write_file(entries: List[SubtitleEntry],
+                   input_path: str,
+                   output_format: str,
+                   output_path: Optional[str] = None) -> str:
+        """
+        将已解析的字幕条目写为指定格式
+        
+        Args:
+            entries: 字幕条目列表
+            input_path: 原始字幕文件路径（用于生成默认输出路径）
+            output_format: 目标格式 (srt, vtt, ass, ssa, sub)
+            output_path: 输出文件路径（可选，默认自动生成）
+        
+        Returns:
+            输出文件路径
+        """
         output_format = output_format.lower()
-        if output_format == 'srt':
-            output_content = SubtitleConverter.to_srt(entries)
-        elif output_format == 'vtt':
-            output_content = SubtitleConverter.to_vtt(entries)
-        elif output_format == 'ass':
-            output_content = SubtitleConverter.to_ass(entries)
-        elif output_format == 'ssa':
-            output_content = SubtitleConverter.to_ssa(entries)
-        elif output_format == 'sub':
-            output_content = SubtitleConverter.to_sub(entries)
-        else:
+        render = _FORMAT_RENDERERS.get(output_format)
+        if render is None:
             raise ValueError(f"不支持的格式: {output_format}")
         
+        output_content = render(entries)
+        
         # 生成输出路径
         if output_path is None:
             input_file = Path(input_path)
@@ -327,27 +335,72 @@ Format: Marked, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         return output_path
     
     @staticmethod
-    def convert_to_all_formats(input_path: str) -> Dict[str, str]:
+    def convert_file(input_path: str, 
+                    output_format: str,
+                    output_path: Optional[str] = None) -> str:
         """
-        将字幕转换为所有支持的格式
+        转换字幕文件格式
+        
+        Args:
+            input_path: 输入文件路径（通常是 .srt）
+            output_format: 目标格式 (srt, vtt, ass, ssa, sub)
+            output_path: 输出文件路径（可选，默认自动生成）
+        
+        Returns:
+            输出文件路径
+        """
+        entries = SubtitleConverter.read_srt_file(input_path)
+        return SubtitleConverter.write_file(entries, input_path, output_format, output_path)
+    
+    @staticmethod
+    def convert_to_formats(input_path: str, formats: List[str]) -> Dict[str, str]:
+        """
+        将字幕转换为多种格式（输入文件只读取、解析一次）
         
         Args:
             input_path: 输入 SRT 文件路径
+            formats: 目标格式列表
         
         Returns:
-            格式 -> 输出路径的字典
+            格式 -> 输出路径的字典（转换失败的格式不包含在内）
         """
-        formats = ['srt', 'vtt', 'ass', 'ssa', 'sub']
+        entries = SubtitleConverter.read_srt_file(input_path)
         results = {}
         
         for fmt in formats:
             try:
-                output_path = SubtitleConverter.convert_file(input_path, fmt)
-                results[fmt] = output_path
+                results[fmt] = SubtitleConverter.write_file(entries, input_path, fmt)
             except Exception as e:
                 print(f"转换为 {fmt} 格式失败: {e}")
         
         return results
+    
+    @staticmethod
+    def convert_to_all_formats(input_path: str) -> Dict[str, str]:
+        """
+        将字幕转换为所有支持的格式
+        
+        Args:
+            input_path: 输入 SRT 文件路径
+        
+        Returns:
+            格式 -> 输出路径的字典
+        """
+        try:
+            return SubtitleConverter.convert_to_formats(input_path, list(_FORMAT_RENDERERS))
+        except Exception as e:
+            print(f"读取字幕失败: {e}")
+            return {}
+
+
+# 格式 -> 渲染函数
+_FORMAT_RENDERERS = {
+    'srt': SubtitleConverter.to_srt,
+    'vtt': SubtitleConverter.to_vtt,
+    'ass': SubtitleConverter.to_ass,
+    'ssa': SubtitleConverter.to_ssa,
+    'sub': SubtitleConverter.to_sub,
+}
 
 
 # ============================================================================
@@ -11,11 +11,16 @@
 
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 from openai import OpenAI
 from dataclasses import dataclass
 
+from services.http_client import get_http_client
+from utils import json_utils
+
 
 @dataclass
 class TranslationConfig:
@@ -26,12 +31,42 @@ class TranslationConfig:
     target_language: str
     source_language: str = 'auto'
     max_lines_per_batch: int = 500  # 每批最多翻译多少行
+    max_tokens_per_batch: int = 0   # 每批输入 token 预算（0 = 按模型自动选择）
+    max_concurrent_batches: int = 0  # 同时翻译的批次数（0 = 按提供商自动选择）
     max_retries: int = 3
     timeout: int = 180
 
 
+# 默认单批次输入 token 预算（输出约与输入等长，需为输出留出空间）
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
+
+# 小上下文模型的预算覆盖（按模型名子串匹配）
+MODEL_BATCH_TOKEN_BUDGETS = (
+    ('8k', 3000),
+)
+
+# 每行 JSON 包装（{"line": n, "text": ...}）的额外 token 开销
+LINE_TOKEN_OVERHEAD = 8
+
+# 分批翻译的默认并发数（本地 Ollama 受显存/算力限制，远程 API 主要受网络延迟限制）
+OLLAMA_BATCH_CONCURRENCY = 4
+REMOTE_BATCH_CONCURRENCY = 8
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数
+    
+    CJK 等宽字符约 1 字 1 token，其余字符约 4 字符 1 token
+    """
+    wide = sum(1 for ch in text if ch >= '\u2e80')
+    return wide + (len(text) - wide) // 4 + 1
+
+
 class SubtitleEntry:
     """字幕条目"""
+    __slots__ = ('index', 'timecode', 'text')
+    
     def __init__(self, index: str, timecode: str, text: str):
         self.index = index
         self.timecode = timecode
@@ -68,6 +103,77 @@ class ParseError(TranslationError):
     pass
 
 
+def _elision_error(expected_count: int) -> ParseError:
+    """AI 用省略号代替部分译文时的解析错误"""
+    return ParseError(
+        f"AI 返回了省略格式（包含 ...），请求的 {expected_count} 条翻译未完整返回。"
+        "这通常是因为内容过长，请降低 max_lines_per_batch 配置。"
+    )
+
+
+class _ElisionDetector:
+    """
+    流式检测 JSON 数组中字符串之外的省略号（...）
+    
+    按到达的文本增量扫描，记录是否处于字符串内；数组开始（第一个 [）之前的前缀文本不检测
+    """
+    
+    __slots__ = ('started', 'in_string', 'escaped', 'dots')
+    
+    def __init__(self):
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.dots = 0
+    
+    def feed(self, text: str) -> bool:
+        """
+        输入新到达的文本
+        
+        Returns:
+            是否在字符串之外出现了 ...
+        """
+        for ch in text:
+            if not self.started:
+                self.started = ch == '['
+            elif self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '.':
+                self.dots += 1
+                if self.dots >= 3:
+                    return True
+            else:
+                self.dots = 0
+                self.in_string = ch == '"'
+        return False
+
+
+@lru_cache(maxsize=8)
+def get_openai_client(base_url: str, api_key: str) -> OpenAI:
+    """
+    获取 OpenAI 客户端（按 base_url + api_key 缓存）
+    
+    同一提供商的翻译任务复用同一客户端，底层共享 HTTP 连接池
+    
+    Args:
+        base_url: API 地址
+        api_key: API 密钥
+    
+    Returns:
+        OpenAI 客户端
+    """
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=get_http_client()
+    )
+
+
 class SubtitleTranslator:
     """字幕翻译器"""
     
@@ -99,13 +205,61 @@ class SubtitleTranslator:
         if "ollama" in config.base_url.lower():
             api_key = "ollama"
         
-        self.client = OpenAI(api_key=api_key, base_url=config.base_url)
+        self.client = get_openai_client(config.base_url, api_key)
     
     def _update_progress(self, current: int, total: int, message: str):
         """更新进度"""
         if self.progress_callback:
             self.progress_callback(current, total, message)
     
+    def _get_batch_token_budget(self) -> int:
+        """获取单批次输入 token 预算"""
+        if self.config.max_tokens_per_batch > 0:
+            return self.config.max_tokens_per_batch
+        
+        model = self.config.model_name.lower()
+        for key, budget in MODEL_BATCH_TOKEN_BUDGETS:
+            if key in model:
+                return budget
+        return DEFAULT_BATCH_TOKEN_BUDGET
+    
+    def _plan_batches(self, entries: List[SubtitleEntry]) -> List[Tuple[int, int]]:
+        """
+        按行数上限和 token 预算切分批次
+        
+        Args:
+            entries: 字幕条目列表
+        
+        Returns:
+            批次区间列表 [(start, end), ...]（左闭右开）
+        """
+        max_lines = self.config.max_lines_per_batch
+        budget = self._get_batch_token_budget()
+        
+        batches = []
+        start = 0
+        used = 0
+        for i, entry in enumerate(entries):
+            cost = estimate_tokens(entry.text) + LINE_TOKEN_OVERHEAD
+            if i > start and (i - start >= max_lines or used + cost > budget):
+                batches.append((start, i))
+                start = i
+                used = 0
+            used += cost
+        
+        if start < len(entries):
+            batches.append((start, len(entries)))
+        
+        return batches
+    
+    def _get_batch_concurrency(self) -> int:
+        """获取分批翻译的并发数"""
+        if self.config.max_concurrent_batches > 0:
+            return self.config.max_concurrent_batches
+        if "ollama" in self.config.base_url.lower():
+            return OLLAMA_BATCH_CONCURRENCY
+        return REMOTE_BATCH_CONCURRENCY
+    
     def _get_target_lang_name(self) -> str:
         """获取目标语言名称"""
         return self.LANG_NAMES.get(
@@ -212,14 +366,11 @@ Now output the COMPLETE JSON array (no extra text, no abbreviations):"""
         # 检查是否包含省略符号 "..."
         if '...' in response and '"...' not in response:
             # 如果 ... 出现在非字符串中（即作为省略符号），说明 AI 返回了缩略格式
-            raise ParseError(
-                f"AI 返回了省略格式（包含 ...），请求的 {expected_count} 条翻译未完整返回。"
-                "这通常是因为内容过长，请降低 max_lines_per_batch 配置。"
-            )
+            raise _elision_error(expected_count)
         
-        # 尝试解析 JSON
+        # 尝试解析 JSON（orjson 的解析错误是 json.JSONDecodeError 的子类）
         try:
-            data = json.loads(response)
+            data = json_utils.loads(response)
         except json.JSONDecodeError as e:
             # JSON 解析失败，尝试修复常见问题
             
@@ -227,7 +378,7 @@ Now output the COMPLETE JSON array (no extra text, no abbreviations):"""
             if response.rstrip().endswith(',]'):
                 response = response.rstrip()[:-2] + ']'
                 try:
-                    data = json.loads(response)
+                    data = json_utils.loads(response)
                 except:
                     pass
             
@@ -235,7 +386,7 @@ Now output the COMPLETE JSON array (no extra text, no abbreviations):"""
             if not response.rstrip().endswith(']'):
                 response = response.rstrip() + ']'
                 try:
-                    data = json.loads(response)
+                    data = json_utils.loads(response)
                 except:
                     pass
             
@@ -276,6 +427,46 @@ Now output the COMPLETE JSON array (no extra text, no abbreviations):"""
         
         return translations
     
+    def _request_translation(self, prompt: str, expected_count: int) -> str:
+        """
+        流式请求翻译，边接收边检测省略格式
+        
+        发现 AI 用省略号代替译文时立即断开，不再等待整个（无效的）响应生成完毕；
+        超时按两次数据到达的间隔计算，长批次不会因总生成时间过长而超时
+        
+        Args:
+            prompt: 翻译提示词
+            expected_count: 期望的翻译数量
+        
+        Returns:
+            完整的响应文本
+        
+        Raises:
+            ParseError: AI 返回了省略格式
+        """
+        detector = _ElisionDetector()
+        parts = []
+        
+        with self.client.chat.completions.create(
+            model=self.config.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            timeout=self.config.timeout,
+            stream=True
+        ) as stream:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                
+                parts.append(delta)
+                if detector.feed(delta):
+                    raise _elision_error(expected_count)
+        
+        return ''.join(parts).strip()
+    
     def _translate_batch(
         self,
         entries: List[SubtitleEntry],
@@ -312,14 +503,7 @@ Now output the COMPLETE JSON array (no extra text, no abbreviations):"""
         last_error = None
         for attempt in range(self.config.max_retries):
             try:
-                response = self.client.chat.completions.create(
-                    model=self.config.model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.3,
-                    timeout=self.config.timeout
-                )
-                
-                raw_response = response.choices[0].message.content.strip()
+                raw_response = self._request_translation(prompt, len(entries))
                 translations = self._parse_translation_response(raw_response, len(entries))
                 
                 # 构建翻译后的字幕条目
@@ -382,10 +566,10 @@ Now output the COMPLETE JSON array (no extra text, no abbreviations):"""
             return []
         
         total_lines = len(entries)
-        max_batch = self.config.max_lines_per_batch
+        batches = self._plan_batches(entries)
         
         # 短视频：一次性翻译
-        if total_lines <= max_batch:
+        if len(batches) == 1:
             self._update_progress(0, total_lines, f"开始翻译 {total_lines} 行字幕...")
             
             try:
@@ -395,32 +579,59 @@ Now output the COMPLETE JSON array (no extra text, no abbreviations):"""
             except Exception as e:
                 raise TranslationError(f"翻译失败: {e}")
         
-        # 长视频：分批翻译（保留上下文）
-        translated_entries = []
-        total_batches = (total_lines + max_batch - 1) // max_batch
+        # 长视频：分批并发翻译（上下文取自原文，各批次互不依赖）
+        total_batches = len(batches)
+        workers = min(self._get_batch_concurrency(), total_batches)
+        translated_batches: List[List[SubtitleEntry]] = [[] for _ in batches]
+        done_lines = 0
+        done_batches = 0
+        
+        self._update_progress(
+            0,
+            total_lines,
+            f"开始翻译 {total_lines} 行字幕（{total_batches} 批，并发 {workers}）..."
+        )
         
-        for i in range(0, total_lines, max_batch):
-            batch_num = i // max_batch + 1
-            batch = entries[i:i+max_batch]
-            
-            # 获取上下文
-            context_before = entries[i-1].text if i > 0 else None
-            context_after = entries[i+max_batch].text if i+max_batch < total_lines else None
-            
-            self._update_progress(
-                i, 
-                total_lines, 
-                f"正在翻译第 {batch_num}/{total_batches} 批（{len(batch)} 行）..."
-            )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for batch_num, (start, end) in enumerate(batches):
+                # 获取上下文
+                context_before = entries[start-1].text if start > 0 else None
+                context_after = entries[end].text if end < total_lines else None
+                
+                future = pool.submit(
+                    self._translate_batch,
+                    entries[start:end],
+                    context_before,
+                    context_after
+                )
+                futures[future] = (batch_num, end - start)
             
-            try:
-                translated_batch = self._translate_batch(batch, context_before, context_after)
-                translated_entries.extend(translated_batch)
-            except Exception as e:
-                raise TranslationError(
-                    f"第 {batch_num}/{total_batches} 批翻译失败: {e}"
+            # 进度回调只在当前线程中调用
+            for future in as_completed(futures):
+                batch_num, batch_size = futures[future]
+                try:
+                    translated_batches[batch_num] = future.result()
+                except Exception as e:
+                    # 取消尚未开始的批次，已在进行的批次结束后退出
+                    for f in futures:
+                        f.cancel()
+                    raise TranslationError(
+                        f"第 {batch_num + 1}/{total_batches} 批翻译失败: {e}"
+                    )
+                
+                done_lines += batch_size
+                done_batches += 1
+                self._update_progress(
+                    done_lines,
+                    total_lines,
+                    f"已完成 {done_batches}/{total_batches} 批（{done_lines}/{total_lines} 行）"
                 )
         
+        translated_entries = []
+        for translated_batch in translated_batches:
+            translated_entries.extend(translated_batch)
+        
         self._update_progress(total_lines, total_lines, "翻译完成！")
         return translated_entries
 
@@ -429,36 +640,61 @@ Now output the COMPLETE JSON array (no extra text, no abbreviations):"""
 # 辅助函数
 # ============================================================================
 
+def _parse_srt_block(block_lines: List[str]) -> Optional[SubtitleEntry]:
+    """
+    解析单个 SRT 字幕块
+    
+    Args:
+        block_lines: 字幕块的行（不含空行分隔符）
+    
+    Returns:
+        字幕条目，格式不完整时返回 None
+    """
+    lines = '\n'.join(block_lines).strip().split('\n')
+    if len(lines) < 3:
+        return None
+    
+    return SubtitleEntry(
+        index=lines[0].strip(),
+        timecode=lines[1].strip(),
+        text='\n'.join(lines[2:]).strip()
+    )
+
+
 def parse_srt_file(srt_path: str) -> List[SubtitleEntry]:
     """
     解析 SRT 文件
     
+    逐行流式读取，按空行切分字幕块，不在内存中保留整个文件内容
+    
     Args:
         srt_path: SRT 文件路径
     
     Returns:
         字幕条目列表
     """
-    with open(srt_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
     entries = []
-    blocks = content.strip().split('\n\n')
+    block = []
     
-    for block in blocks:
-        lines = block.strip().split('\n')
-        if len(lines) >= 3:
-            try:
-                entries.append(
-                    SubtitleEntry(
-                        index=lines[0].strip(),
-                        timecode=lines[1].strip(),
-                        text='\n'.join(lines[2:]).strip()
-                    )
-                )
-            except Exception as e:
-                print(f"[警告] 跳过无效字幕块: {e}")
-                continue
+    def flush_block():
+        try:
+            entry = _parse_srt_block(block)
+            if entry is not None:
+                entries.append(entry)
+        except Exception as e:
+            print(f"[警告] 跳过无效字幕块: {e}")
+        block.clear()
+    
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line:
+                block.append(line)
+            elif block:
+                flush_block()
+    
+    if block:
+        flush_block()
     
     return entries
 
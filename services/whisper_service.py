@@ -5,14 +5,82 @@ Whisper 字幕提取服务
 负责从视频中提取字幕
 """
 
+import os
+import time
+from functools import lru_cache
+from dataclasses import fields
 from pathlib import Path
-from typing import Optional, Callable
-from faster_whisper import WhisperModel
+from typing import Dict, Optional, Callable, Tuple
 
+import ctranslate2
+from faster_whisper import WhisperModel, BatchedInferencePipeline
+from faster_whisper.vad import VadOptions
+
+from core.config import MODELS_DIR
 from core.models import WhisperConfig, VADParameters
 from utils.format_utils import format_timestamp
 
 
+# 自动模式下的批量推理大小
+AUTO_BATCH_SIZE_CUDA = 16
+AUTO_BATCH_SIZE_CPU = 4
+
+# CPU 推理线程上限（faster-whisper 超过 4 线程后基本不再提速）
+MAX_CPU_THREADS = 4
+
+# CPU 不支持半精度计算，这些类型在 CPU 上统一降为 int8
+_GPU_ONLY_COMPUTE_TYPES = frozenset({'float16', 'int8_float16', 'bfloat16', 'int8_bfloat16'})
+
+# 转写进度回调的最小间隔（秒），每次回调都会写一次数据库
+PROGRESS_INTERVAL = 1.0
+
+# SRT 写入：每累积多少条字幕合并写一次，以及文件缓冲区大小
+SRT_WRITE_CHUNK = 128
+SRT_WRITE_BUFFER = 1 << 20
+
+
+# VadOptions 中语音概率阈值的字段名（faster-whisper 1.1.0 为 onset，其余版本为 threshold）
+_VAD_THRESHOLD_FIELD = (
+    'onset' if 'onset' in {f.name for f in fields(VadOptions)} else 'threshold'
+)
+
+
+def _build_vad_parameters(vad_params: VADParameters) -> Dict:
+    """
+    生成传给 transcribe 的 VAD 参数（按当前 faster-whisper 版本的字段名）
+    
+    Args:
+        vad_params: VAD 参数
+    
+    Returns:
+        VadOptions 关键字参数字典
+    """
+    params = vad_params.to_dict()
+    params[_VAD_THRESHOLD_FIELD] = params.pop('threshold')
+    return params
+
+
+@lru_cache(maxsize=1)
+def _load_whisper_model(
+    model_size: str,
+    device: str,
+    compute_type: str,
+    download_root: str
+) -> WhisperModel:
+    """
+    加载 Whisper 模型（进程内缓存）
+    
+    只保留最近使用的一个模型，相同配置的后续任务直接复用，避免重复加载权重
+    """
+    return WhisperModel(
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=min(MAX_CPU_THREADS, os.cpu_count() or 1),
+        download_root=download_root
+    )
+
+
 class WhisperService:
     """Whisper 字幕提取服务"""
     
@@ -20,7 +88,7 @@ class WhisperService:
         self,
         config: WhisperConfig,
         vad_params: VADParameters,
-        model_dir: str = "./data/models"
+        model_dir: str = MODELS_DIR
     ):
         """
         初始化 Whisper 服务
@@ -34,6 +102,40 @@ class WhisperService:
         self.vad_params = vad_params
         self.model_dir = model_dir
         self.model: Optional[WhisperModel] = None
+        self.pipeline: Optional[BatchedInferencePipeline] = None
+        self.device, self.compute_type = self._resolve_device()
+        self.batch_size = self._resolve_batch_size()
+    
+    def _resolve_batch_size(self) -> int:
+        """解析批量推理大小（0 表示按设备自动选择）"""
+        if self.config.batch_size > 0:
+            return self.config.batch_size
+        if self.device == 'cuda':
+            return AUTO_BATCH_SIZE_CUDA
+        return AUTO_BATCH_SIZE_CPU
+    
+    def _resolve_device(self) -> Tuple[str, str]:
+        """
+        解析实际使用的设备和计算精度
+        
+        Returns:
+            (device, compute_type)
+        """
+        device = self.config.device
+        compute_type = self.config.compute_type
+        
+        # CTranslate2 仅支持 cpu/cuda；无可用 GPU 时回退到 CPU
+        if device == 'cuda' and ctranslate2.get_cuda_device_count() == 0:
+            print("[WhisperService] CUDA not available, falling back to CPU")
+            device = 'cpu'
+        elif device not in ('cpu', 'cuda'):
+            print(f"[WhisperService] Device '{device}' not supported, falling back to CPU")
+            device = 'cpu'
+        
+        if device == 'cpu' and compute_type in _GPU_ONLY_COMPUTE_TYPES:
+            compute_type = 'int8'
+        
+        return device, compute_type
     
     def load_model(self):
         """加载 Whisper 模型"""
@@ -41,13 +143,21 @@ class WhisperService:
             return
         
         try:
-            self.model = WhisperModel(
+            self.model = _load_whisper_model(
                 self.config.model_size,
-                device=self.config.device,
-                compute_type=self.config.compute_type,
-                download_root=self.model_dir
+                self.device,
+                self.compute_type,
+                self.model_dir
+            )
+            
+            # 批量推理：按 VAD 切分后成批送入模型，提高吞吐
+            if self.batch_size > 1:
+                self.pipeline = BatchedInferencePipeline(model=self.model)
+            
+            print(
+                f"[WhisperService] Model loaded: {self.config.model_size} "
+                f"({self.device}/{self.compute_type}, batch_size={self.batch_size})"
             )
-            print(f"[WhisperService] Model loaded: {self.config.model_size}")
         except Exception as e:
             print(f"[WhisperService] Failed to load model: {e}")
             raise
@@ -86,7 +196,7 @@ class WhisperService:
             'audio': video_path,
             'beam_size': 5,
             'vad_filter': True,
-            'vad_parameters': self.vad_params.to_dict(),
+            'vad_parameters': _build_vad_parameters(self.vad_params),
             'word_timestamps': True,
             'condition_on_previous_text': True,
             'temperature': [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
@@ -98,7 +208,13 @@ class WhisperService:
         
         try:
             # 执行转录
-            segments, info = self.model.transcribe(**transcribe_params)
+            if self.pipeline is not None:
+                segments, info = self.pipeline.transcribe(
+                    batch_size=self.batch_size,
+                    **transcribe_params
+                )
+            else:
+                segments, info = self.model.transcribe(**transcribe_params)
             
             # 更新进度
             if progress_callback:
@@ -106,24 +222,40 @@ class WhisperService:
                 lang_name = get_lang_name(info.language)
                 progress_callback(15, 100, f"检测语言: {lang_name}")
             
-            # 写入 SRT 文件
-            with open(output_path, 'w', encoding='utf-8') as f:
-                idx = 0
-                for seg in segments:
-                    idx += 1
-                    
-                    # 写入字幕条目
-                    f.write(f"{idx}\n")
-                    f.write(
-                        f"{format_timestamp(seg.start)} --> "
-                        f"{format_timestamp(seg.end)}\n"
-                    )
-                    f.write(f"{seg.text.strip()}\n\n")
+            # 边转写边写入临时文件，完成后再改名为正式字幕，
+            # 转写中途失败不会留下残缺的 .srt
+            part_path = output_path + '.part'
+            try:
+                with open(part_path, 'w', encoding='utf-8', buffering=SRT_WRITE_BUFFER) as f:
+                    blocks = []
+                    idx = 0
+                    last_report = time.monotonic()
+                    for seg in segments:
+                        idx += 1
+                        blocks.append(
+                            f"{idx}\n"
+                            f"{format_timestamp(seg.start)} --> {format_timestamp(seg.end)}\n"
+                            f"{seg.text.strip()}\n\n"
+                        )
+                        if len(blocks) >= SRT_WRITE_CHUNK:
+                            f.write(''.join(blocks))
+                            blocks.clear()
+                        
+                        # 更新进度（按时间节流）
+                        if progress_callback:
+                            now = time.monotonic()
+                            if now - last_report >= PROGRESS_INTERVAL:
+                                last_report = now
+                                progress = 15 + min(35, int(idx / 300 * 35))
+                                progress_callback(progress, 100, f"已转写 {idx} 行")
                     
-                    # 更新进度
-                    if progress_callback and idx % 10 == 0:
-                        progress = 15 + min(35, int(idx / 300 * 35))
-                        progress_callback(progress, 100, f"已转写 {idx} 行")
+                    f.write(''.join(blocks))
+                
+                os.replace(part_path, output_path)
+            except BaseException:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
             
             # 完成
             if progress_callback:
@@ -138,8 +270,10 @@ class WhisperService:
     def unload_model(self):
         """卸载模型（释放内存）"""
         if self.model is not None:
+            self.pipeline = None
             del self.model
             self.model = None
+            _load_whisper_model.cache_clear()
             print("[WhisperService] Model unloaded")
 
 
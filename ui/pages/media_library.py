@@ -7,7 +7,8 @@
 """
 
 import time
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 import streamlit as st
 
 from database.media_dao import MediaDAO
@@ -19,6 +20,16 @@ from services.media_scanner import (
 from utils.format_utils import format_file_size
 
 
+# 字幕语言 -> 徽章颜色（中文绿色、英文蓝色，其余灰色）
+_LANG_CHIP_CLASS = {
+    'zh': 'chip-green',
+    'chs': 'chip-green',
+    'cht': 'chip-green',
+    'en': 'chip-blue',
+    'eng': 'chip-blue',
+}
+
+
 def render_media_library_page(debug_mode: bool = False):
     """渲染媒体库页面"""
     
@@ -77,23 +88,20 @@ def render_media_library_page(debug_mode: bool = False):
             "无字幕": False
         }
         
-        files = MediaDAO.get_media_files_filtered(filter_map[filter_type])
+        media_iter = MediaDAO.iter_media_files(filter_map[filter_type])
         
-        # 如果选择了子目录，进一步过滤
+        # 如果选择了子目录，边读取边过滤（不在选中目录下的文件不保留）
         if selected_dirs:
             # 只要文件路径包含任意一个被选中的目录路径即可
-            filtered_files = []
-            for f in files:
-                for d in selected_dirs:
-                    if d in f.file_path:
-                        filtered_files.append(f)
-                        break
-            files = filtered_files
+            files = [
+                f for f in media_iter
+                if any(d in f.file_path for d in selected_dirs)
+            ]
+        else:
+            files = list(media_iter)
         
         # 统计选中文件
-        selected_count = sum(
-            1 for f in files if st.session_state.get(f"s_{f.id}", False)
-        )
+        selected_count = sum(1 for f in files if _is_selected(f))
         
         # 开始处理按钮（去掉 emoji）
         if selected_count > 0:
@@ -125,18 +133,31 @@ def render_media_library_page(debug_mode: bool = False):
         return
     
     # ========== 全选功能 ==========
-    current_select_all = st.checkbox("全选", key="select_all_box")  # 去掉 emoji
-    last_select_all = st.session_state.get("_last_select_all", False)
-    
-    if current_select_all != last_select_all:
-        for f in files:
-            st.session_state[f"s_{f.id}"] = current_select_all
-        st.session_state["_last_select_all"] = current_select_all
-        st.rerun()
+    # 切换全选时只递增选择代数：各文件复选框换用新 key，默认值跟随全选状态，
+    # 无需逐个写入 session_state
+    select_all = st.checkbox("全选", key="select_all", on_change=_next_selection_generation)
     
     # ========== 渲染文件列表 ==========
     for f in files:
-        _render_media_card(f)
+        _render_media_card(f, select_all)
+
+
+def _selection_key(file_id: int) -> str:
+    """文件复选框的 session_state key（随全选切换而更新）"""
+    return f"s_{st.session_state.get('_selection_gen', 0)}_{file_id}"
+
+
+def _next_selection_generation():
+    """全选切换回调：丢弃单个文件的勾选状态"""
+    st.session_state['_selection_gen'] = st.session_state.get('_selection_gen', 0) + 1
+
+
+def _is_selected(media_file) -> bool:
+    """文件是否被选中（未单独勾选过的文件跟随全选状态）"""
+    return st.session_state.get(
+        _selection_key(media_file.id),
+        st.session_state.get("select_all", False)
+    )
 
 
 def _render_statistics(total: int, selected: int, selected_dirs: list, filter_type: str):
@@ -163,16 +184,18 @@ def _render_statistics(total: int, selected: int, selected_dirs: list, filter_ty
 
 def _add_tasks_for_selected_files(files: list):
     """为选中的文件添加任务"""
-    success_count = 0
-    failed_files = []
+    selected = [f for f in files if _is_selected(f)]
     
-    for f in files:
-        if st.session_state.get(f"s_{f.id}", False):
-            ok, msg = TaskDAO.add_task(f.file_path)
-            if ok:
-                success_count += 1
-            else:
-                failed_files.append((f.file_name, msg))
+    try:
+        success_count, existing_paths = TaskDAO.add_tasks([f.file_path for f in selected])
+    except Exception as e:
+        st.error(f"添加失败: {e}")
+        return
+    
+    existing_paths = set(existing_paths)
+    failed_files = [
+        (f.file_name, "任务已存在") for f in selected if f.file_path in existing_paths
+    ]
     
     # 显示结果
     if failed_files:
@@ -216,49 +239,72 @@ def _perform_scan(subdirectories: list, debug_mode: bool):
     st.rerun()
 
 
-def _render_media_card(media_file):
+def _render_media_card(media_file, select_all: bool):
     """渲染单个媒体文件卡片"""
-    # 构建字幕徽章
-    if not media_file.subtitles:
-        badges = "<span class='status-chip chip-red'>无字幕</span>"
-    else:
-        badges = ""
-        for sub in media_file.subtitles:
-            lang = sub.lang.lower()
-            if lang in ['zh', 'chs', 'cht']:
-                cls = "chip-green"
-            elif lang in ['en', 'eng']:
-                cls = "chip-blue"
-            else:
-                cls = "chip-gray"
-            badges += f"<span class='status-chip {cls}'>{sub.tag}</span>"
-    
     # 布局：复选框 + 卡片
     c_check, c_card = st.columns([0.5, 20], gap="medium", vertical_alignment="center")
     
     with c_check:
-        key = f"s_{media_file.id}"
-        if key not in st.session_state:
-            st.session_state[key] = False
-        st.checkbox("选", key=key, label_visibility="collapsed")
+        st.checkbox(
+            "选",
+            value=select_all,
+            key=_selection_key(media_file.id),
+            label_visibility="collapsed"
+        )
     
     with c_card:
         st.markdown(
-            f"""
+            _build_media_card_html(
+                media_file.file_name,
+                media_file.file_size,
+                media_file.file_path,
+                tuple((sub.lang, sub.tag) for sub in media_file.subtitles)
+            ),
+            unsafe_allow_html=True
+        )
+
+
+@lru_cache(maxsize=4096)
+def _build_media_card_html(
+    file_name: str,
+    file_size: int,
+    file_path: str,
+    subtitles: Tuple[Tuple[str, str], ...]
+) -> str:
+    """
+    生成媒体文件卡片 HTML（按卡片内容缓存，文件未变化时重绘直接复用）
+    
+    Args:
+        file_name: 文件名
+        file_size: 文件大小
+        file_path: 文件路径
+        subtitles: ((语言代码, 标签), ...)
+    
+    Returns:
+        卡片 HTML
+    """
+    # 构建字幕徽章
+    if not subtitles:
+        badges = "<span class='status-chip chip-red'>无字幕</span>"
+    else:
+        badges = ""
+        for lang, tag in subtitles:
+            cls = _LANG_CHIP_CLASS.get(lang.lower(), "chip-gray")
+            badges += f"<span class='status-chip {cls}'>{tag}</span>"
+    
+    return f"""
             <div class="hero-card">
                 <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:8px;">
                     <div style="font-weight:600; font-size:15px; overflow:hidden; white-space:nowrap; text-overflow:ellipsis;">
-                        {media_file.file_name}
+                        {file_name}
                     </div>
                     <div style="font-size:12px; color:#71717a; min-width:60px; text-align:right;">
-                        {format_file_size(media_file.file_size)}
+                        {format_file_size(file_size)}
                     </div>
                 </div>
                 <div style="font-size:12px; color:#52525b; margin-bottom:12px; font-family:monospace;">
-                    {media_file.file_path}
+                    {file_path}
                 </div>
                 <div>{badges}</div>
             </div>
-            """,
-            unsafe_allow_html=True
-        )
\ No newline at end of file
+            """
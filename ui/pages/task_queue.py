@@ -5,14 +5,25 @@
 显示和管理任务
 """
 
-import time
-from pathlib import Path
+import os
 import streamlit as st
 
 from database.task_dao import TaskDAO
 from core.models import TaskStatus
 
 
+# 有未结束（等待中/处理中）的任务时，任务列表的自动刷新间隔（秒）
+REFRESH_INTERVAL = 3
+
+# 任务状态 -> (徽章样式, 显示文本)
+_STATUS_CHIPS = {
+    TaskStatus.PENDING: ('chip-gray', '等待中'),
+    TaskStatus.PROCESSING: ('chip-blue', '处理中'),
+    TaskStatus.COMPLETED: ('chip-green', '完成'),
+    TaskStatus.FAILED: ('chip-red', '失败')
+}
+
+
 def render_task_queue_page():
     """渲染任务队列页面"""
     
@@ -24,39 +35,45 @@ def render_task_queue_page():
             TaskDAO.clear_completed_tasks()
             st.rerun()
     
-    # 加载任务列表
+    # 任务列表放在 fragment 中：有未结束的任务时只定时重跑列表本身，
+    # 不再阻塞等待后重跑整个页面（媒体库等其他部分保持不动）
+    active = TaskDAO.has_active_task()
+    st.fragment(
+        _render_task_list,
+        run_every=REFRESH_INTERVAL if active else None
+    )(active)
+
+
+def _render_task_list(auto_refresh: bool):
+    """
+    渲染任务列表
+    
+    Args:
+        auto_refresh: 本 fragment 是否处于定时刷新状态
+    """
     tasks = TaskDAO.get_all_tasks()
+    has_active = any(
+        t.status in (TaskStatus.PENDING, TaskStatus.PROCESSING) for t in tasks
+    )
+    
+    # 是否有未结束任务与当前刷新设置不一致（如全部任务已结束）时，重跑整个页面以切换定时刷新
+    if has_active != auto_refresh:
+        st.rerun()
     
     # 空状态
     if not tasks:
         st.info("队列为空")
         return
     
-    # 检查是否有处理中的任务
-    has_processing = any(t.status == TaskStatus.PROCESSING for t in tasks)
-    
     # 渲染任务列表
     for task in tasks:
         _render_task_card(task)
-    
-    # 如果有处理中的任务，自动刷新
-    if has_processing:
-        time.sleep(3)
-        st.rerun()
 
 
 def _render_task_card(task):
     """渲染单个任务卡片"""
     
-    # 状态映射
-    status_map = {
-        TaskStatus.PENDING: ('chip-gray', '等待中'),
-        TaskStatus.PROCESSING: ('chip-blue', '处理中'),
-        TaskStatus.COMPLETED: ('chip-green', '完成'),
-        TaskStatus.FAILED: ('chip-red', '失败')
-    }
-    
-    css_class, status_text = status_map.get(
+    css_class, status_text = _STATUS_CHIPS.get(
         task.status,
         ('chip-gray', task.status.value)
     )
@@ -68,27 +85,23 @@ def _render_task_card(task):
     
     # ✅ 核心修复：将 HTML 压缩为单行字符串
     # 这样无论你的 IDE 怎么缩进，Markdown 都不会把它当成代码块渲染
-    html_content = f"""<div class="task-card-wrapper"><div class="hero-card"><div style="display:flex; justify-content:space-between; align-items:flex-start;"><div style="flex:1;"><div style="font-weight:600; margin-bottom:8px;">{Path(task.file_path).name}</div><div style="font-size:13px; color:#a1a1aa;">> {task.log}</div></div><div style="display:flex; flex-direction:column; align-items:flex-end; gap:8px; margin-left:16px;"><span style="font-size:11px; color:#71717a;">{task.created_at}</span><span class="status-chip {css_class}">{status_text}</span></div></div>{progress_html}</div></div>"""
+    html_content = f"""<div class="task-card-wrapper"><div class="hero-card"><div style="display:flex; justify-content:space-between; align-items:flex-start;"><div style="flex:1;"><div style="font-weight:600; margin-bottom:8px;">{os.path.basename(task.file_path)}</div><div style="font-size:13px; color:#a1a1aa;">> {task.log}</div></div><div style="display:flex; flex-direction:column; align-items:flex-end; gap:8px; margin-left:16px;"><span style="font-size:11px; color:#71717a;">{task.created_at}</span><span class="status-chip {css_class}">{status_text}</span></div></div>{progress_html}</div></div>"""
     
     st.markdown(html_content, unsafe_allow_html=True)
     
-    # 操作按钮（使用独立的列）
-    col_space, col_ops = st.columns([8, 2])
+    # 操作按钮（一次性创建所需的列，不再嵌套列布局）
+    if task.status == TaskStatus.FAILED:
+        # 失败任务：重试 + 删除
+        _, col_retry, col_del = st.columns([8, 1, 1])
+        with col_retry:
+            if st.button("重试", key=f"retry_{task.id}", use_container_width=True):
+                TaskDAO.reset_task(task.id)
+                st.rerun()
+    else:
+        # 其他状态：仅删除
+        _, col_del = st.columns([8, 2])
     
-    with col_ops:
-        if task.status == TaskStatus.FAILED:
-            # 失败任务：重试 + 删除
-            subcol1, subcol2 = st.columns(2)
-            with subcol1:
-                if st.button("重试", key=f"retry_{task.id}", use_container_width=True):
-                    TaskDAO.reset_task(task.id)
-                    st.rerun()
-            with subcol2:
-                if st.button("删除", key=f"del_{task.id}", use_container_width=True):
-                    TaskDAO.delete_task(task.id)
-                    st.rerun()
-        else:
-            # 其他状态：仅删除
-            if st.button("删除", key=f"del_{task.id}", use_container_width=True):
-                TaskDAO.delete_task(task.id)
-                st.rerun()
\ No newline at end of file
+    with col_del:
+        if st.button("删除", key=f"del_{task.id}", use_container_width=True):
+            TaskDAO.delete_task(task.id)
+            st.rerun()
\ No newline at end of file
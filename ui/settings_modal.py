@@ -6,7 +6,6 @@
 """
 
 import streamlit as st
-import requests
 from typing import List, Tuple
 
 from core.config import (
@@ -17,6 +16,7 @@ from core.config import (
 )
 from core.models import ContentType, ISO_LANG_MAP, TARGET_LANG_OPTIONS
 from database.connection import get_db_connection
+from services.http_client import get_http_client
 
 
 # ============================================================================
@@ -60,7 +60,7 @@ def fetch_ollama_models(base_url: str) -> List[str]:
     """获取 Ollama 模型列表"""
     try:
         root_url = base_url.replace("/v1", "").rstrip("/")
-        resp = requests.get(f"{root_url}/api/tags", timeout=2.0)
+        resp = get_http_client().get(f"{root_url}/api/tags", timeout=2.0)
         if resp.status_code == 200:
             return [m['name'] for m in resp.json().get('models', [])]
     except Exception as e:
@@ -148,14 +148,34 @@ def render_settings_dialog():
             
         with col_w2:
             # 计算类型
-            compute_types = ["int8", "float16"]
+            compute_types = ["int8", "float16", "int8_float16"]
+            curr_ct = config.whisper.compute_type
+            if curr_ct not in compute_types:
+                curr_ct = "int8"
+            
             compute_type = st.selectbox(
                 "计算精度",
                 compute_types,
-                index=compute_types.index(config.whisper.compute_type)
+                index=compute_types.index(curr_ct),
+                help="CPU 运行时半精度类型会自动使用 int8"
             )
             whisper_changes['compute_type'] = compute_type
             
+            # 批量推理大小
+            batch_sizes = [0, 1, 2, 4, 8, 16, 32]
+            curr_batch = config.whisper.batch_size
+            if curr_batch not in batch_sizes:
+                curr_batch = 0
+            
+            batch_size = st.selectbox(
+                "批量推理",
+                batch_sizes,
+                format_func=lambda x: "自动" if x == 0 else ("关闭" if x == 1 else str(x)),
+                index=batch_sizes.index(curr_batch),
+                help="自动：GPU 16 / CPU 4，数值越大越快但占用更多显存/内存"
+            )
+            whisper_changes['batch_size'] = batch_size
+            
     # 2. 语音识别参数 (逻辑参数)
     with tab_params:
         st.subheader("识别参数配置")
@@ -370,6 +390,7 @@ def _save_full_config(mgr, w_changes, m_changes, t_changes, e_changes):
     config.whisper.compute_type = w_changes['compute_type']
     config.whisper.device = w_changes['device']
     config.whisper.source_language = w_changes['source_language']
+    config.whisper.batch_size = w_changes['batch_size']
     config.content_type = w_changes['content_type']
     
     # Models
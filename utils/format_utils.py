@@ -5,7 +5,9 @@
 提供各种数据格式化功能
 """
 
-from core.models import ISO_LANG_MAP
+from typing import Optional
+
+from core.models import ISO_LANG_MAP, LANG_NAME_TO_CODE
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -35,14 +37,44 @@ def format_timestamp(seconds: float) -> str:
     Returns:
         SRT 时间格式（HH:MM:SS,mmm）
     """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    milliseconds = int((seconds % 1) * 1000)
+    # 先四舍五入到整数毫秒，避免浮点误差（如 1.2 秒得到 1199 毫秒）
+    secs, milliseconds = divmod(round(seconds * 1000), 1000)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
     
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
 
 
+def code_to_name(code: str, default: Optional[str] = None) -> str:
+    """
+    语言代码 -> 中文名称
+    
+    Args:
+        code: 语言代码（如 'zh', 'eng'，不区分大小写）
+        default: 未知代码时的返回值（None=原样返回代码）
+    
+    Returns:
+        中文名称
+    """
+    return ISO_LANG_MAP.get(code.lower(), code if default is None else default)
+
+
+def lang_to_code(value: str) -> str:
+    """
+    语言代码或中文名称 -> 语言代码
+    
+    Args:
+        value: 语言代码（如 'EN'）或中文名称（如 '英语'）
+    
+    Returns:
+        小写语言代码，无法识别时返回 'unknown'
+    """
+    code = value.lower()
+    if code in ISO_LANG_MAP:
+        return code
+    return LANG_NAME_TO_CODE.get(value, 'unknown')
+
+
 def get_lang_name(code: str) -> str:
     """
     获取语言代码对应的中文名称
@@ -53,7 +85,7 @@ def get_lang_name(code: str) -> str:
     Returns:
         中文名称
     """
-    return ISO_LANG_MAP.get(code.lower(), code)
+    return code_to_name(code)
 
 
 def format_duration(seconds: int) -> str:
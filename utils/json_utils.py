@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 工具函数
+优先使用 orjson（C 实现，CJK 文本序列化更快），未安装时回退到标准库 json
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 标准库回退：复用同一个编码器实例，避免每次调用 json.dumps 都新建编码器
+_json_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def dumps(obj) -> str:
+    """
+    序列化为 JSON 字符串（非 ASCII 字符不转义）
+    
+    Args:
+        obj: 可序列化对象
+    
+    Returns:
+        JSON 字符串
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return _json_encode(obj)
+
+
+def loads(data):
+    """
+    解析 JSON 字符串
+    
+    Args:
+        data: JSON 字符串或字节串
+    
+    Returns:
+        解析结果
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
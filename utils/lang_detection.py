@@ -7,6 +7,46 @@
 
 import re
 
+from utils.format_utils import code_to_name
+
+
+# 预编译正则（模块加载时编译一次）
+# 各文字字符类按连续片段匹配，计数时累加片段长度，比逐字匹配少分配大量单字符串
+_RE_CJK = re.compile(r'[\u4e00-\u9fa5]+')
+_RE_HIRAGANA = re.compile(r'[\u3040-\u309f]+')
+_RE_KATAKANA = re.compile(r'[\u30a0-\u30ff]+')
+_RE_HANGUL = re.compile(r'[\uac00-\ud7af]+')
+_RE_ENGLISH_WORD = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# 繁体中文特征字
+_TRADITIONAL_MARKERS = frozenset('臺灣繁體於與個們裡這妳臉廳學習')
+
+# 文件名中的语言后缀 -> 语言代码（同一文件名出现多个后缀时，靠前的优先）
+_FILENAME_LANG_CODES = {
+    'chs': 'chs',
+    'cht': 'cht',
+    'eng': 'en',
+    'jpn': 'ja',
+    'kor': 'ko',
+    'zh': 'chs',
+    'en': 'en',
+    'ja': 'ja',
+    'ko': 'ko',
+}
+_FILENAME_LANG_PRIORITY = {code: i for i, code in enumerate(_FILENAME_LANG_CODES)}
+
+
+def _count_chars(pattern: re.Pattern, content: str) -> int:
+    """统计 content 中匹配字符类的字符总数"""
+    return sum(map(len, pattern.findall(content)))
+
+
+def _is_srt_metadata_line(line: str) -> bool:
+    """判断是否为 SRT 序号行或时间轴行（先看首字符，文本行几乎都在这里被排除）"""
+    if not '0' <= line[:1] <= '9':
+        return False
+    return (line.isdigit() and line.isascii()) or '-->' in line
+
 
 def detect_language_from_subtitle(srt_path: str) -> str:
     """
@@ -19,54 +59,44 @@ def detect_language_from_subtitle(srt_path: str) -> str:
         语言代码（zh/chs/cht/en/ja/ko/unknown）
     """
     try:
-        with open(srt_path, 'r', encoding='utf-8', errors='ignore') as f:
-            raw_content = f.read(4096)  # 只读取前 4KB
+        # 只读取前 4KB（二进制读取后一次解码，不经过文本包装层；末尾被截断的多字节字符忽略）
+        with open(srt_path, 'rb') as f:
+            raw_content = f.read(4096).decode('utf-8', errors='ignore')
         
-        # 移除时间轴和序号
-        content = re.sub(
-            r'\d{2}:\d{2}:\d{2},\d{3}\s*-->\s*\d{2}:\d{2}:\d{2},\d{3}',
-            '',
-            raw_content
+        # 移除时间轴和序号（splitlines 同时处理 \r\n，与文本模式的换行转换一致）
+        content = '\n'.join(
+            line for line in raw_content.splitlines() if not _is_srt_metadata_line(line)
         )
-        content = re.sub(r'^\d+$', '', content, flags=re.MULTILINE)
         
-        # 统计字符
-        total_chars = len(re.sub(r'\s+', '', content))
+        # 统计非空白字符（str.split() 按 Unicode 空白切分，与 \s 等价）
+        total_chars = sum(map(len, content.split()))
         if total_chars < 50:
             return 'unknown'
         
-        # 统计各语言特征字符
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fa5]', content))
-        hiragana_chars = len(re.findall(r'[\u3040-\u309f]', content))
-        katakana_chars = len(re.findall(r'[\u30a0-\u30ff]', content))
-        hangul_chars = len(re.findall(r'[\uac00-\ud7af]', content))
-        
-        # 繁体中文特征字
-        traditional_markers = [
-            '臺', '灣', '繁', '體', '於', '與', 
-            '個', '們', '裡', '這', '妳', '臉', 
-            '廳', '學', '習'
-        ]
-        traditional_count = sum(1 for char in traditional_markers if char in content)
-        
-        # 统计英文单词
-        english_words = re.findall(r'\b[a-zA-Z]{3,}\b', content)
-        english_chars = sum(len(word) for word in english_words)
+        # 纯 ASCII 内容（常见于英文字幕）无需再跑 Unicode 正则
+        if content.isascii():
+            english_chars = sum(len(word) for word in _RE_ENGLISH_WORD.findall(content))
+            return 'en' if english_chars / total_chars >= 0.5 else 'unknown'
         
-        # 判断语言
-        if hiragana_chars >= 5 or katakana_chars >= 5:
+        # 按判断顺序统计特征字符，命中即返回，不扫描后续字符类
+        if (_count_chars(_RE_HIRAGANA, content) >= 5
+                or _count_chars(_RE_KATAKANA, content) >= 5):
             return 'ja'
         
-        if hangul_chars >= 10:
+        if _count_chars(_RE_HANGUL, content) >= 10:
             return 'ko'
         
+        chinese_chars = _count_chars(_RE_CJK, content)
         if chinese_chars >= 10:
-            # 区分简繁体
+            # 区分简繁体（出现过的不同繁体特征字个数）
+            traditional_count = len(_TRADITIONAL_MARKERS.intersection(content))
             if traditional_count >= 3 and traditional_count / chinese_chars >= 0.2:
                 return 'cht'
             return 'chs'
         
-        if total_chars > 0 and english_chars / total_chars >= 0.5:
+        # 统计英文单词
+        english_chars = sum(len(word) for word in _RE_ENGLISH_WORD.findall(content))
+        if english_chars / total_chars >= 0.5:
             return 'en'
         
         return 'unknown'
@@ -86,27 +116,15 @@ def detect_language_from_filename(filename: str) -> str:
     Returns:
         语言代码（zh/chs/cht/en/ja/ko/unknown）
     """
-    filename_lower = filename.lower()
-    
-    # 检查常见语言代码
-    lang_codes = {
-        'chs': 'chs',
-        'cht': 'cht',
-        'eng': 'en',
-        'jpn': 'ja',
-        'kor': 'ko',
-        'zh': 'chs',
-        'en': 'en',
-        'ja': 'ja',
-        'ko': 'ko',
-    }
-    
-    for code, lang in lang_codes.items():
-        # 检查 .code. 或 .code 结尾
-        if f".{code}." in filename_lower or filename_lower.endswith(f".{code}"):
-            return lang
+    # 按 . 切分一次，第一段之后的每一段都是候选后缀（即 .code. 或以 .code 结尾）
+    matches = [
+        part for part in filename.lower().split('.')[1:]
+        if part in _FILENAME_LANG_CODES
+    ]
+    if not matches:
+        return 'unknown'
     
-    return 'unknown'
+    return _FILENAME_LANG_CODES[min(matches, key=_FILENAME_LANG_PRIORITY.__getitem__)]
 
 
 def detect_language_combined(
@@ -144,20 +162,4 @@ def get_language_tag(lang_code: str) -> str:
     Returns:
         语言标签（中文）
     """
-    lang_map = {
-        'chs': '简中',
-        'cht': '繁中',
-        'zh': '中文',
-        'en': '英语',
-        'eng': '英语',
-        'ja': '日语',
-        'jpn': '日语',
-        'ko': '韩语',
-        'kor': '韩语',
-        'fr': '法语',
-        'de': '德语',
-        'ru': '俄语',
-        'es': '西班牙语',
-        'unknown': '未知'
-    }
-    return lang_map.get(lang_code.lower(), '未知')
\ No newline at end of file
+    return code_to_name(lang_code, '未知')
\ No newline at end of file